@@ -0,0 +1,183 @@
+"""
+Seeded, vectorized generators of the point sets used in the labs. Every generator returns a NumPy array
+(points of shape (n, 2), segments of shape (n, 2, 2)). Generators called with a seed give the same data
+every time, so large datasets are saved in the cache directory and loaded on the next call:
+
+    points = uniform_points(-1000, 1000, 10 ** 7, seed=0)
+
+Set the BITALG_CACHE environment variable to change the cache directory and datasets.cache_dir = None
+to disable the cache.
+"""
+import functools
+import hashlib
+import inspect
+import os
+
+import numpy as np
+
+# directory of cached datasets, None disables caching
+cache_dir = os.path.join(os.environ.get('BITALG_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'bitalg')),
+                         'datasets')
+# smaller datasets are faster to generate than to load
+CACHE_MIN_SIZE = 10 ** 5
+
+
+# arguments which are numbers of points, all other arguments except the seed are coordinates
+_COUNTS = {'n', 'axis_n', 'diag_n'}
+
+
+def _seed_key(seed):
+    # None if results of the seed can't be reproduced (a Generator changes its state)
+    if isinstance(seed, (int, np.integer)):
+        return int(seed)
+    if isinstance(seed, np.random.SeedSequence):
+        return 'SeedSequence', repr(seed.entropy), tuple(seed.spawn_key), seed.pool_size
+    return None
+
+
+def _cached(generator):
+    signature = inspect.signature(generator)
+
+    @functools.wraps(generator)
+    def wrapper(*args, **kwargs):
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        seed = _seed_key(arguments.arguments['seed'])
+        if cache_dir is None or seed is None:
+            return generator(*args, **kwargs)
+
+        # coordinates are compared as floats, so e.g. (-1000, 1000) and (-1000.0, 1000.0) are one dataset,
+        # counts and the seed keep their exact values
+        key = repr([(name, seed if name == 'seed' else int(value) if name in _COUNTS else
+                     np.asarray(value, dtype=np.float64).tolist())
+                    for name, value in sorted(arguments.arguments.items())])
+        path = os.path.join(cache_dir, f"{generator.__name__}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.npy")
+        if os.path.exists(path):
+            return np.load(path)
+
+        data = generator(*args, **kwargs)
+        if data.size >= CACHE_MIN_SIZE:
+            os.makedirs(cache_dir, exist_ok=True)
+            # write to a temporary file first, so concurrent runs never read a partial file
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as file:
+                np.save(file, data)
+            os.replace(temporary, path)
+        return data
+    return wrapper
+
+
+@_cached
+def uniform_points(left=-100, right=100, n=100, seed=None):
+    """
+    :param left: lower bound of both coordinates
+    :param right: upper bound of both coordinates
+    :param n: number of points
+    :param seed: seed of the random generator
+    :return: array of shape (n, 2) of points uniformly distributed on the square [left, right]^2
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(left, right, (n, 2))
+
+
+@_cached
+def circle_points(O=(0, 0), R=10, n=100, seed=None):
+    """
+    :param O: center of the circle
+    :param R: radius of the circle
+    :param n: number of points
+    :param seed: seed of the random generator
+    :return: array of shape (n, 2) of points uniformly distributed on the circle
+    """
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(-np.pi, np.pi, n)
+    return np.column_stack([np.cos(angles) * R + O[0], np.sin(angles) * R + O[1]])
+
+
+@_cached
+def collinear_points(a=(-1.0, 0.0), b=(1.0, 0.1), n=100, left=-1000, right=1000, seed=None):
+    """
+    :param a: first point of the line
+    :param b: second point of the line
+    :param n: number of points
+    :param left: lower bound of x coordinates (of y coordinates for a vertical line)
+    :param right: upper bound of x coordinates (of y coordinates for a vertical line)
+    :param seed: seed of the random generator
+    :return: array of shape (n, 2) of points uniformly distributed on the line ab
+    """
+    rng = np.random.default_rng(seed)
+    (ax, ay), (bx, by) = a, b
+    t = rng.uniform(left, right, n)
+    if ax == bx:
+        return np.column_stack([np.full(n, float(ax)), t])
+    return np.column_stack([t, ay + (t - ax) * ((by - ay) / (bx - ax))])
+
+
+def _segment(a, b, n, rng):
+    # n points uniformly distributed on the segment ab
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return a + rng.random(n)[:, None] * (b - a)
+
+
+@_cached
+def rectangle_points(a=(-10, -10), b=(10, -10), c=(10, 10), d=(-10, 10), n=100, seed=None):
+    """
+    :param a: lower left vertex of the rectangle
+    :param b: lower right vertex of the rectangle
+    :param c: upper right vertex of the rectangle
+    :param d: upper left vertex of the rectangle
+    :param n: number of points
+    :param seed: seed of the random generator
+    :return: array of shape (n, 2) of points uniformly distributed on the boundary of the rectangle
+    """
+    rng = np.random.default_rng(seed)
+    vertices = np.array([a, b, c, d], dtype=np.float64)
+    (x0, y0), (x1, y1) = vertices.min(axis=0), vertices.max(axis=0)
+    width, height = x1 - x0, y1 - y0
+    # position on the boundary, counterclockwise from the lower left vertex
+    p = rng.uniform(0, 2 * (width + height), n)
+    sides = [p < width, p < width + height, p < 2 * width + height]
+    x = np.select(sides, [x0 + p, x1, x1 - (p - width - height)], x0)
+    y = np.select(sides, [y0, y0 + (p - width), y1], y1 - (p - 2 * width - height))
+    return np.column_stack([x, y])
+
+
+@_cached
+def square_points(a=(0, 0), b=(10, 0), c=(10, 10), d=(0, 10), axis_n=25, diag_n=20, seed=None):
+    """
+    :param a: lower left vertex of the square
+    :param b: lower right vertex of the square
+    :param c: upper right vertex of the square
+    :param d: upper left vertex of the square
+    :param axis_n: number of points on each of the two sides lying on the axes (lower and left side)
+    :param diag_n: number of points on each diagonal of the square
+    :param seed: seed of the random generator
+    :return: array of shape (4 + 2 * axis_n + 2 * diag_n, 2): the vertices followed by the generated points
+    """
+    rng = np.random.default_rng(seed)
+    vertices = np.array([a, b, c, d], dtype=np.float64)
+    (x0, y0), (x1, y1) = vertices.min(axis=0), vertices.max(axis=0)
+    return np.concatenate([vertices,
+                           _segment((x0, y0), (x0, y1), axis_n, rng), _segment((x0, y0), (x1, y0), axis_n, rng),
+                           _segment((x0, y0), (x1, y1), diag_n, rng), _segment((x1, y0), (x0, y1), diag_n, rng)])
+
+
+@_cached
+def uniform_sections(max_x=100, max_y=100, n=100, seed=None):
+    """
+    No section is vertical and no two ends of sections have the same x coordinate.
+    :param max_x: upper bound of x coordinates, the lower bound is 0
+    :param max_y: upper bound of y coordinates, the lower bound is 0
+    :param n: number of sections
+    :param seed: seed of the random generator
+    :return: array of shape (n, 2, 2) of sections with ends uniformly distributed on [0, max_x] x [0, max_y]
+    """
+    rng = np.random.default_rng(seed)
+    xs = rng.uniform(0, max_x, 2 * n)
+    # redraw repeated x coordinates until all are distinct (rare for doubles)
+    while (np.diff(np.sort(xs)) == 0).any():
+        order = np.argsort(xs)
+        repeated = order[1:][np.diff(xs[order]) == 0]
+        xs[repeated] = rng.uniform(0, max_x, len(repeated))
+    ys = rng.uniform(0, max_y, 2 * n)
+    return np.column_stack([xs, ys]).reshape(n, 2, 2)
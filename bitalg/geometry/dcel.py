@@ -0,0 +1,264 @@
+import numpy as np
+
+# face of half-edges lying on the boundary of the unbounded face
+OUTER = -1
+
+
+def _grow(array, size):
+    # enlarges array to at least size entries (doubling), new entries are -1
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array)), -1, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class DCEL:
+    """
+    Doubly connected edge list of a planar subdivision stored in flat arrays indexed by half-edge id:
+    origin, twin, next, prev and face of every half-edge, one outgoing half-edge of every vertex
+    and one half-edge of every bounded face.
+    Bounded faces are traversed counterclockwise. Removed half-edges, vertices and faces are marked with -1,
+    their ids are reused by later operations.
+    """
+
+    def __init__(self, points, faces):
+        """
+        :param points: array of shape (n, 2)
+        :param faces: counterclockwise vertex indices of every bounded face, e.g. simplices of a triangulation
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        faces = [list(face) for face in faces]
+        n = len(self.points)
+
+        sizes = np.array([len(face) for face in faces], dtype=np.int64)
+        starts = np.cumsum(sizes) - sizes
+        m = int(sizes.sum())
+        origin = np.array([v for face in faces for v in face], dtype=np.int64)
+        face = np.repeat(np.arange(len(faces)), sizes)
+        position = np.arange(m) - starts[face]
+        nxt = starts[face] + (position + 1) % sizes[face]
+        destination = origin[nxt]
+
+        # twins are found by sorting edge keys, edges without a twin bound the unbounded face
+        keys = origin * n + destination
+        order = np.argsort(keys)
+        wanted = destination * n + origin
+        found = np.minimum(np.searchsorted(keys[order], wanted), max(m - 1, 0))
+        twin = np.where(keys[order][found] == wanted, order[found], -1) if m else np.zeros(0, dtype=np.int64)
+
+        boundary = np.nonzero(twin < 0)[0]
+        k = len(boundary)
+        outer = m + np.arange(k)
+        twin[boundary] = outer
+        # outer half-edge b -> a continues with the outer half-edge starting at a
+        starting_at = np.full(n, -1, dtype=np.int64)
+        starting_at[destination[boundary]] = outer
+        outer_next = starting_at[origin[boundary]]
+
+        self.origin = np.concatenate([origin, destination[boundary]])
+        self.twin = np.concatenate([twin, boundary])
+        self.next = np.concatenate([nxt, outer_next])
+        self.face = np.concatenate([face, np.full(k, OUTER, dtype=np.int64)])
+        self.prev = np.empty_like(self.next)
+        self.prev[self.next] = np.arange(m + k)
+
+        self.vertex_edge = np.full(n, -1, dtype=np.int64)
+        self.vertex_edge[self.origin[::-1]] = np.arange(m + k)[::-1]
+        self.face_edge = np.where(sizes > 0, starts, -1).astype(np.int64)
+        self._free_edges = []
+        self._free_faces = []
+
+    # queries
+
+    def destination(self, h):
+        return self.origin[self.twin[h]]
+
+    def face_edges(self, f):
+        start = h = self.face_edge[f]
+        while True:
+            yield int(h)
+            h = self.next[h]
+            if h == start:
+                return
+
+    def face_vertices(self, f):
+        return [int(self.origin[h]) for h in self.face_edges(f)]
+
+    def outgoing(self, v):
+        """
+        Half-edges starting at vertex v, counterclockwise
+        """
+        start = h = self.vertex_edge[v]
+        while h >= 0:
+            yield int(h)
+            h = self.twin[self.prev[h]]
+            if h == start:
+                return
+
+    def neighbors(self, v):
+        return [int(self.destination(h)) for h in self.outgoing(v)]
+
+    def degree(self, v):
+        return sum(1 for _ in self.outgoing(v))
+
+    def vertices(self):
+        return np.nonzero(self.vertex_edge >= 0)[0]
+
+    def faces(self):
+        return np.nonzero(self.face_edge >= 0)[0]
+
+    def triangles(self):
+        """
+        :return: (face ids, array of shape (m, 3) with their vertices) of all triangular bounded faces
+        """
+        faces = self.faces()
+        h0 = self.face_edge[faces]
+        h1 = self.next[h0]
+        h2 = self.next[h1]
+        triangular = self.next[h2] == h0
+        return faces[triangular], np.column_stack([self.origin[h0], self.origin[h1], self.origin[h2]])[triangular]
+
+    # modifications
+
+    def _new_edges(self):
+        if self._free_edges:
+            return self._free_edges.pop(), self._free_edges.pop()
+        m = len(self.origin)
+        for name in ('origin', 'twin', 'next', 'prev', 'face'):
+            setattr(self, name, _grow(getattr(self, name), m + 2))
+        self._free_edges.extend(range(len(self.origin) - 1, m + 1, -1))
+        return m, m + 1
+
+    def _new_face(self):
+        if self._free_faces:
+            return self._free_faces.pop()
+        f = len(self.face_edge)
+        self.face_edge = _grow(self.face_edge, f + 1)
+        self._free_faces.extend(range(len(self.face_edge) - 1, f, -1))
+        return f
+
+    def _link(self, h, nxt):
+        self.next[h] = nxt
+        self.prev[nxt] = h
+
+    def flip(self, h):
+        """
+        Replaces the diagonal h of the quadrilateral formed by two triangles with the other diagonal.
+        (a, b, c) + (b, a, d) -> (a, d, c) + (c, d, b), h becomes d -> c
+        """
+        t = self.twin[h]
+        f1, f2 = self.face[h], self.face[t]
+        h2, t2 = self.next[h], self.next[t]
+        h3, t3 = self.next[h2], self.next[t2]
+        if f1 == OUTER or f2 == OUTER or self.next[h3] != h or self.next[t3] != t:
+            raise ValueError('Only an edge between two triangles can be flipped.')
+        a, b = self.origin[h], self.origin[t]
+        c, d = self.origin[h3], self.origin[t3]
+
+        self.origin[h], self.origin[t] = d, c
+        self._link(h, h3)
+        self._link(h3, t2)
+        self._link(t2, h)
+        self._link(t, t3)
+        self._link(t3, h2)
+        self._link(h2, t)
+        self.face[t2], self.face[h2] = f1, f2
+        self.face_edge[f1], self.face_edge[f2] = h, t
+        self.vertex_edge[a], self.vertex_edge[b] = t2, h2
+
+    def add_diagonal(self, ha, hb):
+        """
+        Splits the face of half-edges ha and hb with a diagonal between their origins.
+        :return: the new half-edge origin(ha) -> origin(hb), which stays in the old face
+        """
+        f = self.face[ha]
+        if self.face[hb] != f:
+            raise ValueError('Half-edges of a diagonal have to lie on the same face.')
+        d1, d2 = self._new_edges()
+        self.origin[d1], self.origin[d2] = self.origin[ha], self.origin[hb]
+        self.twin[d1], self.twin[d2] = d2, d1
+        pa, pb = self.prev[ha], self.prev[hb]
+        self._link(pa, d1)
+        self._link(d1, hb)
+        self._link(pb, d2)
+        self._link(d2, ha)
+
+        g = self._new_face()
+        self.face[d1] = f
+        self.face_edge[f] = d1
+        self.face_edge[g] = d2
+        for h in self.face_edges(g):
+            self.face[h] = g
+        return d1
+
+    def remove_vertex(self, v):
+        """
+        Removes an inner vertex with all its edges, the faces around it are merged into one.
+        :return: id of the merged face
+        """
+        outgoing = list(self.outgoing(v))
+        if any(self.face[h] == OUTER for h in outgoing):
+            raise ValueError(f'Vertex {v} lies on the boundary of the unbounded face.')
+        f = self.face[outgoing[0]]
+
+        for i, h in enumerate(outgoing):
+            after = outgoing[(i + 1) % len(outgoing)]
+            # face of h ends with twin(after) -> v, its last edge continues on the face of after
+            self._link(self.prev[self.twin[after]], self.next[after])
+            w = self.destination(h)
+            if self.vertex_edge[w] == self.twin[h]:
+                self.vertex_edge[w] = self.next[h]
+
+        boundary = self.next[outgoing[0]]
+        for h in outgoing:
+            g = self.face[h]
+            if g != f:
+                self.face_edge[g] = -1
+                self._free_faces.append(int(g))
+            for e in (h, self.twin[h]):
+                self.origin[e] = self.twin[e] = self.next[e] = self.prev[e] = self.face[e] = -1
+                self._free_edges.append(int(e))
+        self.vertex_edge[v] = -1
+
+        self.face_edge[f] = boundary
+        for h in self.face_edges(f):
+            self.face[h] = f
+        return int(f)
+
+    def triangulate_face(self, f):
+        """
+        Triangulates a bounded face by ear clipping. Among all ears the one with the largest minimal angle
+        is cut first, so no needle triangles are made when better ones exist. O(k^3) for a face with k vertices.
+        :return: ids of the triangles
+        """
+        x, y = self.points[:, 0], self.points[:, 1]
+        triangles = []
+        while True:
+            edges = list(self.face_edges(f))
+            if len(edges) <= 3:
+                triangles.append(f)
+                return triangles
+            vertices = [self.origin[h] for h in edges]
+            best, best_quality = None, -1.0
+            for i, h in enumerate(edges):
+                a, b, c = vertices[i - 1], vertices[i], vertices[(i + 1) % len(edges)]
+                cross = (x[b] - x[a]) * (y[c] - y[a]) - (y[b] - y[a]) * (x[c] - x[a])
+                if cross <= 0:
+                    continue
+                # no other vertex of the face may lie in the ear
+                if any(((x[b] - x[a]) * (y[u] - y[a]) - (y[b] - y[a]) * (x[u] - x[a]) >= 0 and
+                        (x[c] - x[b]) * (y[u] - y[b]) - (y[c] - y[b]) * (x[u] - x[b]) >= 0 and
+                        (x[a] - x[c]) * (y[u] - y[c]) - (y[a] - y[c]) * (x[u] - x[c]) >= 0)
+                       for u in vertices if u not in (a, b, c)):
+                    continue
+                # sine of the smallest angle, which lies opposite to the shortest side
+                sides = sorted((np.hypot(x[b] - x[a], y[b] - y[a]), np.hypot(x[c] - x[b], y[c] - y[b]),
+                                np.hypot(x[a] - x[c], y[a] - y[c])))
+                quality = cross / (sides[1] * sides[2])
+                if quality > best_quality:
+                    best, best_quality = h, quality
+            if best is None:
+                raise ValueError(f'Face {f} is not a simple counterclockwise polygon.')
+            self.add_diagonal(self.prev[best], self.next[best])
+            triangles.append(int(self.face[best]))
@@ -0,0 +1,458 @@
+from collections import deque
+
+import numpy as np
+
+from bitalg import profiling
+
+# index of the vertex at infinity; triangles with it ("ghost" triangles) close the convex hull,
+# so every edge of the triangulation has a triangle on both sides
+GHOST = -1
+
+
+def hilbert_index(points, bits=16):
+    """
+    Position of every point on the Hilbert curve covering the bounding box of the points
+    :param points: array of shape (n, 2)
+    :param bits: resolution of the curve, the box is divided into 2^bits x 2^bits cells
+    :return: int64 array of length n
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+    low = points.min(axis=0)
+    span = (points.max(axis=0) - low).max() or 1.0
+    side = 1 << bits
+    cells = ((points - low) / span * (side - 1)).astype(np.int64)
+    x, y = cells[:, 0], cells[:, 1]
+
+    index = np.zeros(len(points), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant, so that the curve inside it has the standard orientation
+        flip = ~ry & rx
+        x, y = np.where(flip, side - 1 - x, x), np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+    return index
+
+
+def brio_order(points, seed=None):
+    """
+    Biased randomized insertion order: points are randomly split into rounds of doubling size,
+    every round is sorted along the Hilbert curve.
+    Random rounds keep expected running time of incremental construction, while the curve order
+    makes consecutive points close to each other, so that point location walks are short.
+    :return: array with permutation of point indices
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    permutation = np.random.default_rng(seed).permutation(n)
+    curve = hilbert_index(points)
+
+    rounds = []
+    end = n
+    while end > 0:
+        start = end // 2 if end > 64 else 0
+        chunk = permutation[start:end]
+        rounds.append(chunk[np.argsort(curve[chunk], kind='stable')])
+        end = start
+    return np.concatenate(rounds[::-1]) if rounds else permutation
+
+
+class Delaunay:
+    """
+    Incremental (Bowyer-Watson) Delaunay triangulation with optional constrained edges.
+
+    Triangles are kept in lists indexed by triangle id: vertices in counterclockwise order
+    and neighbours, where neighbour i lies across the edge opposite to vertex i.
+    The convex hull is closed with ghost triangles (having GHOST as a vertex).
+    """
+
+    def __init__(self, points=(), constraints=(), seed=None):
+        """
+        :param points: array of shape (n, 2)
+        :param constraints: pairs of point indices which have to be edges of the triangulation
+        :param seed: seed of the random insertion order
+        """
+        self._x = []
+        self._y = []
+        self._vertices = []  # [a, b, c] for each triangle, None for deleted triangles
+        self._neighbors = []  # [na, nb, nc] for each triangle
+        self._free = []  # ids of deleted triangles, reused by new ones
+        self._vertex_triangle = []  # some triangle incident to every vertex, -1 if not inserted
+        self._pending = []  # vertices waiting until there are three non-collinear points
+        self._last = -1  # triangle where the next point location starts
+        self.duplicates = {}  # index of a repeated point -> index of the same point inserted earlier
+        self.constrained = set()  # constrained edges as (min index, max index)
+
+        self.insert(points, seed)
+        for a, b in constraints:
+            self.insert_constraint(a, b)
+
+    # predicates
+
+    def _orient(self, a, b, px, py):
+        if profiling.stats is not None:
+            profiling.stats.count('orientation')
+        x, y = self._x, self._y
+        return (x[a] - px) * (y[b] - py) - (y[a] - py) * (x[b] - px)
+
+    def _in_circle(self, t, px, py):
+        if profiling.stats is not None:
+            profiling.stats.count('in_circle')
+        a, b, c = self._vertices[t]
+        x, y = self._x, self._y
+        if GHOST in (a, b, c):
+            # rotate to (u, w, GHOST); the ghost "circle" is the open half-plane left of u -> w
+            # together with the hull edge itself
+            u, w = (b, c) if a == GHOST else (c, a) if b == GHOST else (a, b)
+            side = self._orient(u, w, px, py)
+            if side != 0:
+                return side > 0
+            return min(x[u], x[w]) <= px <= max(x[u], x[w]) and min(y[u], y[w]) <= py <= max(y[u], y[w])
+
+        adx, ady = x[a] - px, y[a] - py
+        bdx, bdy = x[b] - px, y[b] - py
+        cdx, cdy = x[c] - px, y[c] - py
+        return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) +
+                (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) +
+                (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)) > 0
+
+    # triangle storage
+
+    def _new_triangle(self, vertices, neighbors):
+        if self._free:
+            t = self._free.pop()
+            self._vertices[t] = vertices
+            self._neighbors[t] = neighbors
+        else:
+            t = len(self._vertices)
+            self._vertices.append(vertices)
+            self._neighbors.append(neighbors)
+        for v in vertices:
+            if v != GHOST:
+                self._vertex_triangle[v] = t
+        return t
+
+    def _delete_triangle(self, t):
+        self._vertices[t] = None
+        self._neighbors[t] = None
+        self._free.append(t)
+
+    def _replace_neighbor(self, t, old, new):
+        neighbors = self._neighbors[t]
+        neighbors[neighbors.index(old)] = new
+
+    # insertion
+
+    def insert(self, points, seed=None):
+        """
+        Inserts points in BRIO order
+        :param points: array of shape (n, 2)
+        :return: indices of inserted points
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        first = len(self._x)
+        self._x.extend(points[:, 0].tolist())
+        self._y.extend(points[:, 1].tolist())
+        self._vertex_triangle.extend([-1] * len(points))
+        for v in brio_order(points, seed).tolist():
+            self._insert_vertex(first + v)
+        return list(range(first, first + len(points)))
+
+    def _insert_vertex(self, v):
+        if self._last == -1:
+            self._start(v)
+            return
+
+        px, py = self._x[v], self._y[v]
+        t = self._locate(px, py)
+        for u in self._vertices[t]:
+            if u != GHOST and self._x[u] == px and self._y[u] == py:
+                self.duplicates[v] = u
+                return
+
+        # cavity - triangles whose circumcircle contains the point, not crossing constrained edges
+        bad = {t}
+        stack = [t]
+        boundary = []
+        while stack:
+            s = stack.pop()
+            vertices, neighbors = self._vertices[s], self._neighbors[s]
+            for i in range(3):
+                n = neighbors[i]
+                if n in bad:
+                    continue
+                a, b = vertices[(i + 1) % 3], vertices[(i + 2) % 3]
+                if (min(a, b), max(a, b)) not in self.constrained and self._in_circle(n, px, py):
+                    bad.add(n)
+                    stack.append(n)
+                else:
+                    # position of the link back to the cavity, slot s may be reused before it is updated
+                    boundary.append((a, b, n, self._neighbors[n].index(s)))
+
+        for s in bad:
+            self._delete_triangle(s)
+
+        # fill the cavity with a fan of triangles around the new vertex
+        starting_at, ending_at = {}, {}
+        for a, b, n, j in boundary:
+            t = self._new_triangle([a, b, v], [-1, -1, n])
+            self._neighbors[n][j] = t
+            starting_at[a] = t
+            ending_at[b] = t
+        for a, b, _, _ in boundary:
+            t = starting_at[a]
+            self._neighbors[t][0] = starting_at[b]
+            self._neighbors[t][1] = ending_at[a]
+            if a != GHOST and b != GHOST:
+                self._last = t
+
+    def _start(self, v):
+        # first triangle is built from the first three non-collinear points
+        pending = self._pending
+        px, py = self._x[v], self._y[v]
+        for u in pending:
+            if self._x[u] == px and self._y[u] == py:
+                self.duplicates[v] = u
+                return
+        if len(pending) < 2 or self._orient(pending[0], pending[1], px, py) == 0:
+            pending.append(v)
+            return
+
+        a, b = pending[0], pending[1]
+        if self._orient(a, b, px, py) < 0:
+            a, b = b, a
+        triangles = [[a, b, v], [b, a, GHOST], [v, b, GHOST], [a, v, GHOST]]
+        ids = [self._new_triangle(vertices, [-1, -1, -1]) for vertices in triangles]
+        owner = {}
+        for t in ids:
+            vertices = self._vertices[t]
+            for i in range(3):
+                owner[vertices[(i + 1) % 3], vertices[(i + 2) % 3]] = (t, i)
+        for (a_, b_), (t, i) in owner.items():
+            self._neighbors[t][i] = owner[b_, a_][0]
+        self._last = ids[0]
+
+        self._pending = []
+        for u in pending[2:]:
+            self._insert_vertex(u)
+
+    def _locate(self, px, py):
+        """
+        Walks from the last created triangle towards the point.
+        :return: real triangle containing the point or ghost triangle of the hull edge it lies behind
+        """
+        t = self._last
+        if self._vertices[t] is None or GHOST in self._vertices[t]:
+            t = next(s for s, vertices in enumerate(self._vertices) if vertices is not None and GHOST not in vertices)
+        step = 0
+        while True:
+            vertices = self._vertices[t]
+            if GHOST in vertices:
+                return t
+            for k in range(3):
+                i = (k + step) % 3
+                if self._orient(vertices[(i + 1) % 3], vertices[(i + 2) % 3], px, py) < 0:
+                    t = self._neighbors[t][i]
+                    break
+            else:
+                return t
+            step += 1
+
+    # adjacency
+
+    def _triangles_around(self, v):
+        # all triangles (ghost ones included) incident to vertex v, in clockwise order
+        start = t = self._vertex_triangle[v]
+        while True:
+            yield t
+            i = self._vertices[t].index(v)
+            t = self._neighbors[t][(i + 2) % 3]
+            if t == start:
+                return
+
+    def _edge_triangle(self, u, v):
+        # (triangle, index of its third vertex) for the triangle with directed edge u -> v
+        for t in self._triangles_around(u):
+            vertices = self._vertices[t]
+            i = vertices.index(u)
+            if vertices[(i + 1) % 3] == v:
+                return t, (i + 2) % 3
+        return None
+
+    def _flip(self, t, i):
+        """
+        Flips the edge opposite to vertex i of triangle t.
+        (p, q, r) + (s, r, q) -> (p, q, s) + (s, r, p)
+        """
+        vertices, neighbors = self._vertices[t], self._neighbors[t]
+        p, q, r = vertices[i], vertices[(i + 1) % 3], vertices[(i + 2) % 3]
+        n = neighbors[i]
+        nq, nr = neighbors[(i + 1) % 3], neighbors[(i + 2) % 3]
+        j = self._neighbors[n].index(t)
+        s = self._vertices[n][j]
+        n_neighbors = self._neighbors[n]
+        nr2, nq2 = n_neighbors[(j + 1) % 3], n_neighbors[(j + 2) % 3]
+
+        self._vertices[t], self._neighbors[t] = [p, q, s], [nr2, n, nr]
+        self._vertices[n], self._neighbors[n] = [s, r, p], [nq, t, nq2]
+        self._replace_neighbor(nr2, n, t)
+        self._replace_neighbor(nq, t, n)
+        for u, owner in ((p, t), (q, t), (s, n), (r, n)):
+            if u != GHOST:
+                self._vertex_triangle[u] = owner
+
+    # constrained edges
+
+    def _segments_cross(self, a, b, c, d):
+        # proper intersection of segments ab and cd
+        x, y = self._x, self._y
+        return self._orient(a, b, x[c], y[c]) * self._orient(a, b, x[d], y[d]) < 0 and \
+            self._orient(c, d, x[a], y[a]) * self._orient(c, d, x[b], y[b]) < 0
+
+    def _crossing_edges(self, a, b):
+        """
+        :return: (edges crossed by segment ab, vertex lying on ab where the walk stopped or b)
+        """
+        x, y = self._x, self._y
+        bx, by = x[b], y[b]
+        for t in self._triangles_around(a):
+            vertices = self._vertices[t]
+            if GHOST in vertices:
+                continue
+            i = vertices.index(a)
+            right, left = vertices[(i + 1) % 3], vertices[(i + 2) % 3]
+            side_right, side_left = self._orient(a, b, x[right], y[right]), self._orient(a, b, x[left], y[left])
+            for c, side in ((right, side_right), (left, side_left)):
+                # vertex lying on the segment splits the constraint
+                if side == 0 and (x[c] - x[a]) * (bx - x[c]) + (y[c] - y[a]) * (by - y[c]) > 0:
+                    return [], c
+            if side_right < 0 < side_left:
+                break
+        else:
+            raise ValueError(f'Cannot insert constraint ({a}, {b}).')
+
+        crossing = [(left, right)]
+        while True:
+            if (min(left, right), max(left, right)) in self.constrained:
+                raise ValueError(f'Constraint ({a}, {b}) crosses constraint {(min(left, right), max(left, right))}.')
+            t = self._neighbors[t][i]
+            vertices = self._vertices[t]
+            e = next(u for u in vertices if u not in (left, right))
+            if e == b:
+                return crossing, b
+            side = self._orient(a, b, x[e], y[e])
+            if side == 0:
+                return crossing, e
+            if side > 0:
+                left = e
+            else:
+                right = e
+            crossing.append((left, right))
+            # the next triangle lies across the new crossing edge
+            i = next(k for k in range(3) if vertices[k] not in (left, right))
+
+    def insert_constraint(self, a, b):
+        """
+        Makes segment between points a and b an edge of the triangulation (Sloan's edge flipping)
+        :param a: index of the first point
+        :param b: index of the second point
+        """
+        a, b = self.duplicates.get(a, a), self.duplicates.get(b, b)
+        while a != b:
+            if self._edge_triangle(a, b) is not None:
+                self.constrained.add((min(a, b), max(a, b)))
+                return
+            crossing, stop = self._crossing_edges(a, b)
+            self._insert_constraint_part(a, stop, crossing)
+            a = stop
+
+    def _insert_constraint_part(self, a, b, crossing):
+        queue = deque(crossing)
+        created = []
+        while queue:
+            u, v = queue.popleft()
+            t, i = self._edge_triangle(u, v)
+            n = self._neighbors[t][i]
+            w1 = self._vertices[t][i]
+            w2 = self._vertices[n][self._neighbors[n].index(t)]
+            if not self._segments_cross(u, v, w1, w2):
+                # quadrilateral is not convex, try again after other flips
+                queue.append((u, v))
+                continue
+            self._flip(t, i)
+            if self._segments_cross(a, b, w1, w2):
+                queue.append((w1, w2))
+            else:
+                created.append((w1, w2))
+        self.constrained.add((min(a, b), max(a, b)))
+
+        # restore the Delaunay property on the new edges
+        flipped = True
+        while flipped:
+            flipped = False
+            for k, (u, v) in enumerate(created):
+                if (min(u, v), max(u, v)) in self.constrained:
+                    continue
+                t, i = self._edge_triangle(u, v)
+                n = self._neighbors[t][i]
+                if GHOST in self._vertices[t] or GHOST in self._vertices[n]:
+                    continue
+                w1 = self._vertices[t][i]
+                w2 = self._vertices[n][self._neighbors[n].index(t)]
+                if self._in_circle(t, self._x[w2], self._y[w2]):
+                    self._flip(t, i)
+                    created[k] = (w1, w2)
+                    flipped = True
+
+    # results
+
+    @property
+    def points(self):
+        return np.column_stack([self._x, self._y]).reshape(-1, 2)
+
+    def _real_triangles(self):
+        return [t for t, vertices in enumerate(self._vertices) if vertices is not None and GHOST not in vertices]
+
+    @property
+    def simplices(self):
+        """
+        Triangles as array of shape (m, 3) of point indices, counterclockwise (as in scipy.spatial.Delaunay)
+        """
+        triangles = self._real_triangles()
+        return np.array([self._vertices[t] for t in triangles], dtype=np.int64).reshape(-1, 3)
+
+    @property
+    def neighbors(self):
+        """
+        Array of shape (m, 3), neighbors[k][i] is the simplex opposite to vertex i of simplex k, -1 on the hull
+        """
+        triangles = self._real_triangles()
+        position = np.full(len(self._vertices), -1, dtype=np.int64)
+        position[triangles] = np.arange(len(triangles))
+        neighbors = np.array([self._neighbors[t] for t in triangles], dtype=np.int64).reshape(-1, 3)
+        return position[neighbors]
+
+    def halfedges(self):
+        """
+        Half-edge view of the triangulation. Half-edge 3k + i of simplex k goes from vertex i to vertex i + 1.
+        :return: (origin, next, twin) arrays; twin is -1 for half-edges on the convex hull
+        """
+        simplices, neighbors = self.simplices, self.neighbors
+        m = len(simplices)
+        origin = simplices.reshape(-1)
+        index = np.arange(3 * m)
+        nxt = index - index % 3 + (index + 1) % 3
+
+        # twin of i -> i + 1 lies in the neighbour opposite to vertex i + 2 and starts at vertex i + 1
+        other = neighbors[:, [2, 0, 1]].reshape(-1)
+        destination = simplices[:, [1, 2, 0]].reshape(-1)
+        twin = np.full(3 * m, -1, dtype=np.int64)
+        inner = other >= 0
+        j = np.argmax(simplices[other[inner]] == destination[inner, None], axis=1)
+        twin[inner] = 3 * other[inner] + j
+        return origin, nxt, twin
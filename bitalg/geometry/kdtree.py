@@ -0,0 +1,198 @@
+import heapq
+
+import numpy as np
+
+
+def bounding_box(points):
+    """
+    :param points: array of shape (n, 2)
+    :return: (lower left corner, upper right corner) as arrays of shape (2,)
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return points.min(axis=0), points.max(axis=0)
+
+
+class KDTree:
+    """
+    Static k-d tree over an array of points. Every node covers a contiguous range of the points
+    reordered by the tree and keeps their bounding box, so whole subtrees are accepted or rejected
+    at once and only points of partially covered leaves are tested (vectorized).
+    Queries return indices to the original array.
+    """
+
+    def __init__(self, points, leaf_size=32):
+        """
+        :param points: array of shape (n, 2)
+        :param leaf_size: maximal number of points in a leaf
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(self.points)
+        self.order = np.arange(n)
+        self.start, self.stop, self.left, self.right = [], [], [], []
+        lower, upper = [], []
+
+        stack = [(0, n, -1, False)]
+        while stack:
+            start, stop, parent, is_right = stack.pop()
+            node = len(self.start)
+            if parent >= 0:
+                (self.right if is_right else self.left)[parent] = node
+            indices = self.order[start:stop]
+            low, high = bounding_box(self.points[indices]) if stop > start else (np.zeros(2), np.zeros(2))
+            self.start.append(start)
+            self.stop.append(stop)
+            self.left.append(-1)
+            self.right.append(-1)
+            lower.append(tuple(low.tolist()))
+            upper.append(tuple(high.tolist()))
+            if stop - start <= leaf_size:
+                continue
+
+            # split at the median of the wider side of the box
+            axis = int(np.argmax(high - low))
+            middle = (stop - start) // 2
+            split = np.argpartition(self.points[indices, axis], middle)
+            self.order[start:stop] = indices[split]
+            stack.append((start + middle, stop, node, True))
+            stack.append((start, start + middle, node, False))
+
+        self.lower, self.upper = lower, upper
+        self.sorted = self.points[self.order]
+
+    @property
+    def bounds(self):
+        return np.array(self.lower[0]), np.array(self.upper[0])
+
+    def __len__(self):
+        return len(self.points)
+
+    def _collect(self, classify, test):
+        """
+        :param classify: node -> 1 (all points match), -1 (none match), 0 (unknown)
+        :param test: points array -> bool mask of matching points
+        :return: sorted indices of matching points
+        """
+        found = []
+        stack = [0] if len(self.points) else []
+        while stack:
+            node = stack.pop()
+            state = classify(self.lower[node], self.upper[node])
+            if state < 0:
+                continue
+            start, stop = self.start[node], self.stop[node]
+            if state > 0:
+                found.append(self.order[start:stop])
+            elif self.left[node] < 0:
+                found.append(self.order[start:stop][test(self.sorted[start:stop])])
+            else:
+                stack.append(self.right[node])
+                stack.append(self.left[node])
+        return np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def range_query(self, lower, upper):
+        """
+        :param lower: lower left corner (x, y) of the rectangle
+        :param upper: upper right corner (x, y) of the rectangle
+        :return: indices of points inside the rectangle (boundary included)
+        """
+        (x0, y0), (x1, y1) = map(float, lower), map(float, upper)
+
+        def classify(low, high):
+            if high[0] < x0 or low[0] > x1 or high[1] < y0 or low[1] > y1:
+                return -1
+            return 1 if x0 <= low[0] and high[0] <= x1 and y0 <= low[1] and high[1] <= y1 else 0
+
+        def test(points):
+            return (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+
+        return self._collect(classify, test)
+
+    def half_plane(self, a, b, strict=False):
+        """
+        :param a: first point of the directed line
+        :param b: second point of the directed line
+        :param strict: exclude points lying on the line
+        :return: indices of points on the left of the line a -> b
+        """
+        (ax, ay), (bx, by) = map(float, a), map(float, b)
+        dx, dy = bx - ax, by - ay
+
+        def side(x, y):
+            value = dx * (y - ay) - dy * (x - ax)
+            return value > 0 if strict else value >= 0
+
+        def classify(low, high):
+            corners = [side(x, y) for x in (low[0], high[0]) for y in (low[1], high[1])]
+            return 1 if all(corners) else -1 if not any(corners) else 0
+
+        def test(points):
+            return side(points[:, 0], points[:, 1])
+
+        return self._collect(classify, test)
+
+    def knn(self, queries, k=1):
+        """
+        :param queries: array of shape (m, 2)
+        :param k: number of neighbours
+        :return: (distances, indices) arrays of shape (m, k), nearest first
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        if not 0 < k <= len(self.points):
+            raise ValueError(f'k has to be between 1 and the number of points ({len(self.points)}).')
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        for i, (qx, qy) in enumerate(queries.tolist()):
+            distances[i], indices[i] = self._knn(qx, qy, k)
+        return distances, indices
+
+    def _box_distance(self, node, qx, qy):
+        low, high = self.lower[node], self.upper[node]
+        dx = max(low[0] - qx, 0.0, qx - high[0])
+        dy = max(low[1] - qy, 0.0, qy - high[1])
+        return dx * dx + dy * dy
+
+    def _knn(self, qx, qy, k):
+        best_distances = np.full(k, np.inf)
+        best_indices = np.full(k, -1, dtype=np.int64)
+        heap = [(0.0, 0)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > best_distances[-1]:
+                break
+            if self.left[node] >= 0:
+                for child in (self.left[node], self.right[node]):
+                    heapq.heappush(heap, (self._box_distance(child, qx, qy), child))
+                continue
+            start, stop = self.start[node], self.stop[node]
+            points = self.sorted[start:stop]
+            candidates = np.concatenate([best_distances, (points[:, 0] - qx) ** 2 + (points[:, 1] - qy) ** 2])
+            candidate_indices = np.concatenate([best_indices, self.order[start:stop]])
+            best = np.argsort(candidates, kind='stable')[:k]
+            best_distances, best_indices = candidates[best], candidate_indices[best]
+        return np.sqrt(best_distances), best_indices
+
+
+def hull_candidates(points, tree=None):
+    """
+    Akl-Toussaint heuristic: points strictly inside the quadrilateral spanned by the extreme points
+    in x and y can't lie on the convex hull.
+    :param points: array of shape (n, 2)
+    :param tree: KDTree of the points to reuse, otherwise the points are tested directly
+    :return: sorted indices of points which may lie on the convex hull
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 4:
+        return np.arange(len(points))
+    extremes = points[[np.argmin(points[:, 0]), np.argmin(points[:, 1]),
+                       np.argmax(points[:, 0]), np.argmax(points[:, 1])]]
+    # counterclockwise quadrilateral, candidates lie on the right of (or on) any of its edges
+    edges = [(a, b) for a, b in zip(extremes, np.roll(extremes, -1, axis=0)) if not np.array_equal(a, b)]
+    if not edges:
+        return np.arange(len(points))
+    if tree is not None:
+        return np.unique(np.concatenate([tree.half_plane(b, a) for a, b in edges]))
+    # building a tree for four queries costs more than one pass over the points
+    outside = np.zeros(len(points), dtype=bool)
+    for (ax, ay), (bx, by) in edges:
+        outside |= (bx - ax) * (points[:, 1] - ay) - (by - ay) * (points[:, 0] - ax) <= 0
+    return np.nonzero(outside)[0]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import numpy as np
+
+from bitalg import profiling
+
+EPS = 1e-14
+
+
+def det3points(p1: Point, p2: Point, p3: Point):
+    if profiling.stats is not None:
+        profiling.stats.count('orientation')
+    return (p1.x - p3.x) * (p2.y - p3.y) - (p2.x - p3.x) * (p1.y - p3.y)
+
+
+class Point:
+    # no __dict__, so millions of points take a fraction of memory of regular objects
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+    def to_tuple(self) -> (float, float):
+        return self.x, self.y
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __str__(self):
+        return "(" + str(self.x) + ", " + str(self.y) + ")"
+
+    def __repr__(self):
+        return str(self)
+
+    def __eq__(self, other):
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    @classmethod
+    def from_array(cls, array) -> list[Point]:
+        # array of shape (n, 2)
+        return [cls(x, y) for x, y in np.asarray(array, dtype=np.float64).reshape(-1, 2).tolist()]
+
+    @staticmethod
+    def to_array(points) -> np.ndarray:
+        # array of shape (n, 2)
+        return np.array([(point.x, point.y) for point in points], dtype=np.float64).reshape(-1, 2)
+
+
+class Segment:
+    __slots__ = ('start', 'end')
+
+    def __init__(self, start: Point, end: Point):
+        self.start = start
+        self.end = end
+
+    def to_tuple(self) -> ((float, float), (float, float)):
+        return self.start.to_tuple(), self.end.to_tuple()
+
+    def __str__(self):
+        return "[" + str(self.start) + ", " + str(self.end) + "]"
+
+    def __repr__(self):
+        return str(self)
+
+    def __eq__(self, other):
+        return self.start == other.start and self.end == other.end
+
+    def __hash__(self):
+        return hash((self.start.x, self.start.y, self.end.x, self.end.y))
+
+    @classmethod
+    def from_array(cls, array, point=Point) -> list[Segment]:
+        # array of shape (n, 2, 2)
+        return [cls(point(x1, y1), point(x2, y2))
+                for x1, y1, x2, y2 in np.asarray(array, dtype=np.float64).reshape(-1, 4).tolist()]
+
+    @staticmethod
+    def to_array(segments) -> np.ndarray:
+        # array of shape (n, 2, 2)
+        return np.array([(s.start.x, s.start.y, s.end.x, s.end.y) for s in segments],
+                        dtype=np.float64).reshape(-1, 2, 2)
+
+
+class Triangle:
+    __slots__ = ('a', 'b', 'c')
+
+    def __init__(self, a: Point, b: Point, c: Point):
+        self.a = a
+        self.b = b
+        self.c = c
+
+    def to_tuple(self) -> (Point, Point, Point):
+        return self.a, self.b, self.c
+
+    def contains_point(self, point: Point) -> bool:
+        # check if triangle contains point p (also on its boundary)
+
+        det_ab = det3points(self.a, self.b, point)
+        det_bc = det3points(self.b, self.c, point)
+        det_ca = det3points(self.c, self.a, point)
+
+        return (det_ab > -EPS and det_bc > -EPS and det_ca > -EPS) or (det_ab < EPS and det_bc < EPS and det_ca < EPS)
+
+    def overlaps(self, other: Triangle) -> bool:
+        # check if the triangles intersect - no edge of either triangle separates them
+        # (with the tolerance of contains_point, so a point contained in both is never separated)
+
+        for triangle, points in ((self, other.to_tuple()), (other, self.to_tuple())):
+            a, b, c = triangle.to_tuple()
+            for u, v, w in ((a, b, c), (b, c, a), (c, a, b)):
+                side = 1 if det3points(u, v, w) > 0 else -1
+                if all(side * det3points(u, v, point) < -EPS for point in points):
+                    return False
+        return True
+
+    def __str__(self):
+        return str(self.a) + ", " + str(self.b) + ", " + str(self.c)
+
+    def __repr__(self):
+        return str(self)
+
+    def __eq__(self, other):
+        return self.a == other.a and self.b == other.b and self.c == other.c
+
+    def __hash__(self):
+        return hash((self.a, self.b, self.c))
+
+    @classmethod
+    def from_array(cls, array, point=Point) -> list[Triangle]:
+        # array of shape (n, 3, 2)
+        return [cls(point(ax, ay), point(bx, by), point(cx, cy))
+                for ax, ay, bx, by, cx, cy in np.asarray(array, dtype=np.float64).reshape(-1, 6).tolist()]
+
+    @staticmethod
+    def to_array(triangles) -> np.ndarray:
+        # array of shape (n, 3, 2)
+        return np.array([(t.a.x, t.a.y, t.b.x, t.b.y, t.c.x, t.c.y) for t in triangles],
+                        dtype=np.float64).reshape(-1, 3, 2)
@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bitalg.lab3.polygon import as_vertex_array, classify_vertices, triangulation
+
+
+class PolygonBatch:
+    """
+    Ragged collection of polygons stored as one flat array of vertices.
+    Vertices of the i-th polygon are coords[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, coords, offsets):
+        self.coords = as_vertex_array(coords)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if len(self.offsets) == 0 or self.offsets[0] != 0 or self.offsets[-1] != len(self.coords):
+            raise ValueError('Offsets have to start with 0 and end with the number of vertices.')
+        if np.any(np.diff(self.offsets) <= 0):
+            raise ValueError('Every polygon needs at least one vertex.')
+
+    @classmethod
+    def from_polygons(cls, polygons):
+        """
+        :param polygons: iterable of polygons, each given as list of (x, y) tuples or array of shape (n, 2)
+        :return: PolygonBatch
+        """
+        polygons = [as_vertex_array(polygon) for polygon in polygons]
+        offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+        np.cumsum([len(polygon) for polygon in polygons], out=offsets[1:])
+        coords = np.concatenate(polygons) if polygons else np.empty((0, 2))
+        return cls(coords, offsets)
+
+    @classmethod
+    def from_files(cls, paths):
+        """
+        :param paths: files in lab3 test format (one "x y" vertex per line)
+        :return: PolygonBatch
+        """
+        return cls.from_polygons(np.loadtxt(path, ndmin=2) for path in paths)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def split(self, values):
+        """
+        Splits an array aligned with coords (e.g. result of color_vertex) into per polygon arrays
+        """
+        return np.split(values, self.offsets[1:-1])
+
+    def chunks(self, chunk_size):
+        """
+        Yields consecutive sub-batches of at most chunk_size polygons
+        """
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            offsets = self.offsets[start:stop + 1]
+            yield PolygonBatch(self.coords[offsets[0]:offsets[-1]], offsets - offsets[0])
+
+    def _neighbours(self):
+        # indices of previous and next vertex of every vertex within its own polygon
+        index = np.arange(len(self.coords))
+        polygon_id = np.repeat(np.arange(len(self)), self.sizes)
+        first, last = self.offsets[:-1][polygon_id], self.offsets[1:][polygon_id] - 1
+        prev = np.where(index == first, last, index - 1)
+        nxt = np.where(index == last, first, index + 1)
+        return polygon_id, prev, nxt
+
+    def _run(self, func, workers, chunk_size, *args):
+        if workers is None or len(self) <= chunk_size:
+            return func(self, *args)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(func, chunk, *args) for chunk in self.chunks(chunk_size)]
+            results = [future.result() for future in futures]
+        if isinstance(results[0], np.ndarray):
+            return np.concatenate(results)
+        return [item for result in results for item in result]
+
+    def is_y_monotonic(self, workers=None, chunk_size=100_000):
+        """
+        :param workers: number of worker processes, None - compute in the current process
+        :param chunk_size: number of polygons sent to a worker at once
+        :return: bool array with one value per polygon, as is_y_monotonic from lab3
+        """
+        return self._run(_is_y_monotonic, workers, chunk_size)
+
+    def color_vertex(self, eps=1e-12, workers=None, chunk_size=100_000):
+        """
+        :param eps: determinant tolerance
+        :param workers: number of worker processes, None - compute in the current process
+        :param chunk_size: number of polygons sent to a worker at once
+        :return: int8 array aligned with coords holding categories of all vertices (see split)
+        """
+        return self._run(_color_vertex, workers, chunk_size, eps)
+
+    def triangulation(self, workers=None, chunk_size=10_000):
+        """
+        :param workers: number of worker processes, None - compute in the current process
+        :param chunk_size: number of polygons sent to a worker at once
+        :return: list with diagonals (pairs of indices local to the polygon) of every polygon,
+                 empty for polygons which are not y-monotone
+        """
+        return self._run(_triangulation, workers, chunk_size)
+
+
+# module level functions, so that they can be sent to worker processes
+
+def _is_y_monotonic(batch):
+    polygon_id, _, nxt = batch._neighbours()
+    y = batch.coords[:, 1]
+    dy = y[nxt] - y
+    descending = dy < 0
+
+    flat = np.bincount(polygon_id, weights=dy == 0, minlength=len(batch))
+    turns = np.bincount(polygon_id, weights=descending != descending[nxt], minlength=len(batch))
+    # all vertices at the same height count as monotone, same as the per polygon version
+    return (flat == batch.sizes) | ((flat == 0) & (turns == 2))
+
+
+def _color_vertex(batch, eps):
+    _, prev, nxt = batch._neighbours()
+    return classify_vertices(batch.coords[prev], batch.coords, batch.coords[nxt], eps)
+
+
+def _triangulation(batch):
+    monotonic = _is_y_monotonic(batch)
+    return [triangulation(polygon) if monotonic[i] else [] for i, polygon in enumerate(batch)]
@@ -0,0 +1,123 @@
+import numpy as np
+
+from bitalg import profiling
+
+# vertex categories used by color_vertex (same numbering as in lab3 notebook)
+START, END, MERGE, SPLIT, REGULAR = 0, 1, 2, 3, 4
+
+
+def as_vertex_array(polygon):
+    """
+    Converts a polygon to an array of its vertices
+    :param polygon: list of (x, y) tuples or array of shape (n, 2)
+    :return: float64 array of shape (n, 2)
+    """
+    return np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+
+
+def det(a, b, c):
+    """
+    Orientation of triples of points (a, b, c), computed for whole arrays at once
+    :param a: array of shape (..., 2)
+    :param b: array of shape (..., 2)
+    :param c: array of shape (..., 2)
+    :return: array of determinants, same formula as det in lab3 notebook
+    """
+    if profiling.stats is not None:
+        profiling.stats.count('orientation', np.broadcast(a[..., 0], b[..., 0], c[..., 0]).size)
+    return (a[..., 0] - c[..., 0]) * (b[..., 1] - c[..., 1]) - (a[..., 1] - c[..., 1]) * (b[..., 0] - c[..., 0])
+
+
+def is_y_monotonic(polygon):
+    """
+    Vectorized check whether a polygon is y-monotone.
+    The polygon is y-monotone when y strictly decreases along both chains from the highest
+    to the lowest vertex, i.e. no edge is horizontal and the sign of dy changes exactly twice.
+    :param polygon: vertices given counterclockwise
+    :return: bool, the same value as is_y_monotonic from lab3 notebook
+    """
+    y = as_vertex_array(polygon)[:, 1]
+    if np.argmax(y) == np.argmin(y):
+        # all vertices at the same height - both chains are empty
+        return True
+
+    dy = np.roll(y, -1) - y
+    if not np.all(dy):
+        return False
+    descending = dy < 0
+    return int(np.count_nonzero(descending != np.roll(descending, 1))) == 2
+
+
+def classify_vertices(a, b, c, eps=1e-12):
+    """
+    Vertex classification for arrays of (previous, current, next) vertices
+    :param a: previous vertices, array of shape (n, 2)
+    :param b: classified vertices, array of shape (n, 2)
+    :param c: next vertices, array of shape (n, 2)
+    :param eps: determinant tolerance
+    :return: int8 array of length n with categories (START, END, MERGE, SPLIT, REGULAR)
+    """
+    convex = det(a, b, c) > eps
+    below = (a[:, 1] > b[:, 1]) & (c[:, 1] > b[:, 1])
+    above = (a[:, 1] < b[:, 1]) & (c[:, 1] < b[:, 1])
+
+    return np.select([below & convex, below, above & convex, above],
+                     [END, MERGE, START, SPLIT], default=REGULAR).astype(np.int8)
+
+
+def color_vertex(polygon, eps=1e-12):
+    """
+    Vectorized vertex classification: 0 - start, 1 - end, 2 - merge, 3 - split, 4 - regular
+    :param polygon: vertices given counterclockwise
+    :param eps: determinant tolerance
+    :return: list of length n with category of each vertex, the same as color_vertex from lab3 notebook
+    """
+    b = as_vertex_array(polygon)
+    return classify_vertices(np.roll(b, 1, axis=0), b, np.roll(b, -1, axis=0), eps).tolist()
+
+
+def triangulation(polygon):
+    """
+    Triangulation of a y-monotone polygon (stack algorithm from the lecture)
+    :param polygon: vertices given counterclockwise
+    :return: list of diagonals as pairs of vertex indices, e.g. [(1, 5), (2, 3)];
+             empty list if the polygon is not y-monotone
+    """
+    vertices = as_vertex_array(polygon)
+    n = len(vertices)
+    if n < 4 or not is_y_monotonic(vertices):
+        return []
+
+    top = int(np.argmax(vertices[:, 1]))
+    bottom = int(np.argmin(vertices[:, 1]))
+    # going counterclockwise from the top vertex we walk down the left chain
+    steps_from_top = (np.arange(n) - top) % n
+    left = ((steps_from_top > 0) & (steps_from_top < (bottom - top) % n)).tolist()
+    order = np.lexsort((vertices[:, 0], -vertices[:, 1])).tolist()
+    points = vertices.tolist()
+
+    def inside(a, b, c):
+        # diagonal a-c lies inside the polygon if b is a convex vertex of its chain
+        (ax, ay), (bx, by), (cx, cy) = points[a], points[b], points[c]
+        d = (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+        return d > 0 if left[b] else d < 0
+
+    diagonals = []
+    stack = [order[0], order[1]]
+    for j in range(2, n - 1):
+        u = order[j]
+        if left[u] != left[stack[-1]]:
+            # connect u with all vertices of the opposite chain except the lowest one
+            while len(stack) > 1:
+                diagonals.append((u, stack.pop()))
+            stack = [order[j - 1]]
+        else:
+            last = stack.pop()
+            while stack and inside(stack[-1], last, u):
+                last = stack.pop()
+                diagonals.append((u, last))
+            stack.append(last)
+        stack.append(u)
+
+    diagonals.extend((order[-1], v) for v in stack[1:-1])
+    return diagonals
@@ -0,0 +1,133 @@
+"""
+Opt-in instrumentation of the algorithms. Nothing is counted unless the code runs inside profile():
+
+    with profile() as stats:
+        preprocess(points)
+    print(stats)
+
+Instrumented hot paths check `profiling.stats is not None` before counting,
+so with profiling off a counter costs a single attribute lookup.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+# statistics being collected, None when profiling is off
+stats = None
+
+
+class Stats:
+    """
+    Event counters (e.g. orientation predicate calls, event queue operations)
+    and durations of repeated phases (e.g. one duration per level of the Kirkpatrick hierarchy)
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.timings = defaultdict(list)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    @contextmanager
+    def timer(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name].append(perf_counter() - start)
+
+    def merge(self, other):
+        self.counters.update(other.counters)
+        for name, durations in other.timings.items():
+            self.timings[name].extend(durations)
+
+    def as_dict(self):
+        return {'counters': dict(self.counters), 'timings': {name: list(durations)
+                                                             for name, durations in self.timings.items()}}
+
+    def summary(self):
+        # one line, e.g. "orientation: 120, event_queue.add: 8, preprocess.level: 3 x 0.002s"
+        parts = [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        parts += [f"{name}: {len(durations)} x {sum(durations) / len(durations):.3f}s"
+                  for name, durations in sorted(self.timings.items())]
+        return ", ".join(parts)
+
+    def __str__(self):
+        lines = [f"{name:<30} {value:>12}" for name, value in sorted(self.counters.items())]
+        for name, durations in sorted(self.timings.items()):
+            lines.append(f"{name:<30} {sum(durations):>11.3f}s  " +
+                         " ".join(f"{duration:.3f}" for duration in durations))
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile():
+    """
+    Collects statistics of the code run inside the block. Statistics of nested blocks
+    are added to the enclosing ones when they finish.
+    """
+    global stats
+    previous = stats
+    stats = Stats()
+    collected = stats
+    try:
+        yield collected
+    finally:
+        stats = previous
+        if previous is not None:
+            previous.merge(collected)
+
+
+def count(name, n=1):
+    if stats is not None:
+        stats.count(name, n)
+
+
+@contextmanager
+def timer(name):
+    if stats is None:
+        yield
+        return
+    with stats.timer(name):
+        yield
+
+
+class _Counted:
+    # proxy counting calls of chosen methods of the wrapped container
+    def __init__(self, container, name, methods):
+        self._container = container
+        self._name = name
+        self._methods = methods
+
+    def __getattr__(self, attribute):
+        value = getattr(self._container, attribute)
+        if attribute not in self._methods:
+            return value
+
+        def counted(*args, **kwargs):
+            count(f"{self._name}.{attribute}")
+            return value(*args, **kwargs)
+        return counted
+
+    def __len__(self):
+        return len(self._container)
+
+    def __iter__(self):
+        return iter(self._container)
+
+    def __contains__(self, item):
+        return item in self._container
+
+    def __getitem__(self, index):
+        return self._container[index]
+
+
+def counted(container, name, methods=('add', 'remove', 'discard', 'pop')):
+    """
+    Counts calls of methods of a container (e.g. event queue or sweep status) as name.method.
+    :return: counting proxy, or the container itself when profiling is off
+    """
+    if stats is None:
+        return container
+    return _Counted(container, name, methods)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import numpy as np
+
+from bitalg.geometry.primitives import EPS
+from bitalg.project.figures import Node, Triangle
+
+
+class FlatHierarchy:
+    """
+    Kirkpatrick's hierarchy flattened into arrays, so a whole batch of points descends it level by level
+    with vectorized containment tests. Children of the i-th node are children[offsets[i]:offsets[i + 1]],
+    the root has id 0.
+    """
+
+    def __init__(self, root: Node):
+        self.nodes: list[Node] = []
+        ids = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if id(node) in ids:
+                continue
+            ids[id(node)] = len(self.nodes)
+            self.nodes.append(node)
+            stack.extend(reversed(node.children))
+
+        cover = {vertex.to_tuple() for vertex in root.triangle.to_tuple()}
+        self.triangles = np.array([[vertex.to_tuple() for vertex in node.triangle.to_tuple()] for node in self.nodes],
+                                  dtype=np.float64).reshape(-1, 3, 2)
+        # triangles touching the covering triangle lie outside of the point set
+        self.outside = np.array([any(vertex.to_tuple() in cover for vertex in node.triangle.to_tuple())
+                                 for node in self.nodes], dtype=bool)
+        sizes = np.array([len(node.children) for node in self.nodes], dtype=np.int64)
+        self.offsets = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+        self.children = np.array([ids[id(child)] for node in self.nodes for child in node.children], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _contains(self, nodes, points):
+        # the same test as Triangle.contains_point, for pairs nodes[i], points[i]
+        a, b, c = self.triangles[nodes, 0], self.triangles[nodes, 1], self.triangles[nodes, 2]
+
+        def det(p, q):
+            return ((p[:, 0] - points[:, 0]) * (q[:, 1] - points[:, 1]) -
+                    (p[:, 1] - points[:, 1]) * (q[:, 0] - points[:, 0]))
+        dets = np.column_stack([det(a, b), det(b, c), det(c, a)])
+        return (dets > -EPS).all(axis=1) | (dets < EPS).all(axis=1)
+
+    def locate(self, points) -> np.ndarray:
+        """
+        :param points: array of shape (m, 2)
+        :return: ids of nodes whose triangles contain the points, -1 for points outside of the point set
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        current = np.zeros(len(points), dtype=np.int64)
+        active = np.nonzero(self._contains(current, points))[0]
+        result = np.full(len(points), -1, dtype=np.int64)
+
+        while len(active):
+            nodes = current[active]
+            counts = self.offsets[nodes + 1] - self.offsets[nodes]
+            leaf = counts == 0
+            result[active[leaf]] = nodes[leaf]
+            active, nodes, counts = active[~leaf], nodes[~leaf], counts[~leaf]
+
+            # like locate: the first containing child lying inside the point set, otherwise the last containing one
+            chosen = np.full(len(active), -1, dtype=np.int64)
+            inside = np.zeros(len(active), dtype=bool)
+            for j in range(int(counts.max()) if len(counts) else 0):
+                candidate = np.nonzero((j < counts) & ~inside)[0]
+                children = self.children[self.offsets[nodes[candidate]] + j]
+                contains = self._contains(children, points[active[candidate]])
+                candidate, children = candidate[contains], children[contains]
+                chosen[candidate] = children
+                inside[candidate] = ~self.outside[children]
+
+            # a point on no child (numerically) stays at its node
+            stuck = chosen < 0
+            result[active[stuck]] = nodes[stuck]
+            active, chosen = active[~stuck], chosen[~stuck]
+            current[active] = chosen
+
+        located = result >= 0
+        result[located] = np.where(self.outside[result[located]], -1, result[located])
+        return result
+
+    def locate_points(self, points) -> list[Triangle | None]:
+        return [self.nodes[i].triangle if i >= 0 else None for i in self.locate(points).tolist()]
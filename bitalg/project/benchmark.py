@@ -0,0 +1,49 @@
+import copy
+import random
+from time import perf_counter
+
+from bitalg.project import main as kirkpatrick
+from bitalg.project import hierarchy, trapezoidal_map
+from bitalg.project.figures import Point
+
+
+def kirkpatrick_depth(root):
+    # number of levels of the hierarchy
+    return len(hierarchy.levels(root))
+
+
+def run(points, queries, engine, preprocess_args=()):
+    start = perf_counter()
+    structure = engine.preprocess(copy.deepcopy(points), *preprocess_args)
+    built = perf_counter()
+    results = [engine.locate(structure, query) for query in queries]
+    located = perf_counter()
+    return structure, results, built - start, located - built
+
+
+def benchmark(sizes=(50, 100, 200, 400), queries=1000, seed=0):
+    """
+    Compares Kirkpatrick's hierarchy with the trapezoidal map on random points in [0, 10] x [0, 10].
+    Depth is the number of levels of the hierarchy and the mean search path length in the trapezoidal map,
+    agree is the fraction of queries where both engines return the same triangle.
+    """
+    random.seed(seed)
+    print(f"{'n':>6} {'engine':>12} {'build [s]':>10} {'query [us]':>11} {'depth':>6} {'agree':>6}")
+    for n in sizes:
+        points = [Point(random.uniform(0, 10), random.uniform(0, 10)) for _ in range(n)]
+        searched = [Point(random.uniform(0, 10), random.uniform(0, 10)) for _ in range(queries)]
+
+        root, expected, build, query = run(points, searched, kirkpatrick, (False,))
+        print(f"{n:>6} {'kirkpatrick':>12} {build:>10.3f} {query / queries * 1e6:>11.1f} "
+              f"{kirkpatrick_depth(root):>6} {'':>6}")
+
+        tmap, results, build, query = run(points, searched, trapezoidal_map, (seed,))
+        depth = sum(tmap.depth(p.to_tuple()) for p in searched) / queries
+        agree = sum(set(map(Point.to_tuple, r.to_tuple()) if r else ()) ==
+                    set(map(Point.to_tuple, e.to_tuple()) if e else ())
+                    for r, e in zip(results, expected)) / queries
+        print(f"{n:>6} {'trapezoidal':>12} {build:>10.3f} {query / queries * 1e6:>11.1f} {depth:>6.1f} {agree:>6.1%}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,73 +1,18 @@
 from __future__ import annotations
 
 from math import sqrt
-import numpy as np
-from scipy.spatial import Delaunay
 
-from bitalg.visualizer.main import Visualizer
+from bitalg import profiling
+from bitalg.geometry.dcel import DCEL, OUTER
+from bitalg.geometry.delaunay import Delaunay
+from bitalg.geometry.kdtree import bounding_box
+from bitalg.geometry.primitives import EPS, det3points, Point, Triangle
 
-EPS = 1e-14
-
-
-# math
-
-def det3points(p1: Point, p2: Point, p3: Point):
-    return (p1.x - p3.x) * (p2.y - p3.y) - (p2.x - p3.x) * (p1.y - p3.y)
+# the visualizer is imported where it is used, it is expensive to import
 
 
 # data structures
 
-class Point:
-    def __init__(self, x: float, y: float):
-        self.x = x
-        self.y = y
-        self.neighbors = set()
-        self.triangles = set()
-
-    def to_tuple(self) -> (int, int):
-        return self.x, self.y
-
-    def __str__(self):
-        return "(" + str(self.x) + ", " + str(self.y) + ")"
-
-    def __repr__(self):
-        return str(self)
-
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-
-class Triangle:
-    def __init__(self, a: Point, b: Point, c: Point):
-        self.a = a
-        self.b = b
-        self.c = c
-
-    def to_tuple(self) -> (Point, Point, Point):
-        return self.a, self.b, self.c
-
-    def contains_point(self, point: Point) -> bool:
-        # check if triangle contains point p
-
-        det_ab = det3points(self.a, self.b, point)
-        det_bc = det3points(self.b, self.c, point)
-        det_ca = det3points(self.c, self.a, point)
-
-        return (det_ab > -EPS and det_bc > -EPS and det_ca > -EPS) or (det_ab < EPS and det_bc < EPS and det_ca < EPS)
-
-    def __str__(self):
-        return str(self.a) + ", " + str(self.b) + ", " + str(self.c)
-
-    def __eq__(self, other):
-        return self.a == other.a and self.b == other.b and self.c == other.c
-
-    def __hash__(self):
-        return hash((self.a, self.b, self.c))
-
-
 class Node:
     def __init__(self, triangle: Triangle):
         self.triangle = triangle
@@ -81,13 +26,19 @@ class Node:
         return self.triangle == other.triangle and self.children == other.children
 
     def __hash__(self):
-        return hash((self.triangle, self.children))
+        # children are a list and equal nodes have equal triangles
+        return hash(self.triangle)
 
 
 class TriangulatedPointSet:
-    def __init__(self, points: list[Point]):
+    def __init__(self, points: list[Point], seed=0):
         self.points = points
+        # seed of the insertion order of the triangulation, the same points always give the same triangles
+        self.seed = seed
         self.triangles: set[Triangle] = set()
+        # adjacency of the triangulation, vertex ids are indices to self.vertices
+        self.dcel: DCEL = None
+        self.vertices: list[Point] = []
         self.triangle_left_point: Point = None
         self.triangle_right_point: Point = None
         self.triangle_top_point: Point = None
@@ -105,37 +56,32 @@ class TriangulatedPointSet:
         # Triangulate the point set. Resulting Triangles will be in self.triangles
         # complexity O(n log n)
 
-        # use Delaunay triangulation and save result to self.triangles
-        triangulation = Delaunay(np.array(list(map(lambda point: point.to_tuple(), self.points))))
-        self.triangles.clear()
-        for id0, id1, id2 in triangulation.simplices:
-            self.triangles.add(Triangle(self.points[id0], self.points[id1], self.points[id2]))
+        # use Delaunay triangulation and keep it as a DCEL
+        profiling.count('delaunay')
+        triangulation = Delaunay(Point.to_array(self.points), seed=self.seed)
+        self.vertices = list(self.points)
+        self.dcel = DCEL(triangulation.points, triangulation.simplices)
+        self.__update_triangles()
 
-        # update Point neighbours and triangles
-        for triangle in self.triangles:
-            triangle.a.neighbors.add(triangle.b)
-            triangle.a.neighbors.add(triangle.c)
-            triangle.a.triangles.add(triangle)
-
-            triangle.b.neighbors.add(triangle.c)
-            triangle.b.neighbors.add(triangle.a)
-            triangle.b.triangles.add(triangle)
-
-            triangle.c.neighbors.add(triangle.a)
-            triangle.c.neighbors.add(triangle.b)
-            triangle.c.triangles.add(triangle)
+    def __update_triangles(self):
+        _, triangles = self.dcel.triangles()
+        self.triangles = {Triangle(self.vertices[a], self.vertices[b], self.vertices[c])
+                          for a, b, c in triangles.tolist()}
 
     def cover_with_triangle(self):
         # Cover the point set with a triangle
 
-        lower_left = Point(min(self.points, key=lambda p: p.x).x, min(self.points, key=lambda p: p.y).y)
-        upper_right = Point(max(self.points, key=lambda p: p.x).x, max(self.points, key=lambda p: p.y).y)
-        self.triangle_left_point = Point(lower_left.x - (upper_right.y - lower_left.y) / sqrt(3) - EPS,
-                                         lower_left.y - EPS)
-        self.triangle_right_point = Point(upper_right.x + (upper_right.y - lower_left.y) / sqrt(3) + EPS,
-                                          lower_left.y - EPS)
+        low, high = bounding_box(Point.to_array(self.points))
+        lower_left, upper_right = Point(*low.tolist()), Point(*high.tolist())
+        # EPS alone is lost in rounding of large coordinates, points would lie on the sides of the triangle
+        margin = EPS + 1e-9 * max(abs(lower_left.x), abs(lower_left.y), abs(upper_right.x), abs(upper_right.y),
+                                  upper_right.x - lower_left.x, upper_right.y - lower_left.y)
+        self.triangle_left_point = Point(lower_left.x - (upper_right.y - lower_left.y) / sqrt(3) - margin,
+                                         lower_left.y - margin)
+        self.triangle_right_point = Point(upper_right.x + (upper_right.y - lower_left.y) / sqrt(3) + margin,
+                                          lower_left.y - margin)
         self.triangle_top_point = Point(lower_left.x + (upper_right.x - lower_left.x) / 2,
-                                        upper_right.y + (upper_right.x - lower_left.x) / 2 * sqrt(3) + EPS)
+                                        upper_right.y + (upper_right.x - lower_left.x) / 2 * sqrt(3) + margin)
         self.points.extend([self.triangle_left_point, self.triangle_right_point, self.triangle_top_point])
 
     def remove_points(self):
@@ -144,50 +90,50 @@ class TriangulatedPointSet:
 
         # get a set of independent vertices with max degree of 8
         # complexity O(n)
-        points_to_delete = set()
-        cant_delete = {self.triangle_left_point, self.triangle_right_point, self.triangle_right_point}
-        for point in self.points:
-            if point in cant_delete:
+        dcel = self.dcel
+        index = {id(point): v for v, point in enumerate(self.vertices)}
+        cant_delete = {index[id(point)] for point in
+                       (self.triangle_left_point, self.triangle_right_point, self.triangle_top_point)
+                       if id(point) in index}
+        points_to_delete = []
+        for v in dcel.vertices().tolist():
+            if v in cant_delete:
+                continue
+            if any(dcel.face[h] == OUTER for h in dcel.outgoing(v)):
+                # a point on the boundary of the covering triangle can't be removed
                 continue
 
-            if len(point.neighbors) <= 8:
+            neighbors = dcel.neighbors(v)
+            if len(neighbors) <= 8:
                 # choose vertex with degree <= 8 (at most 8 "neighbors")
-                points_to_delete.add(point)
+                points_to_delete.append(v)
 
                 # mark vertices connected to chosen vertex as unavailable (wouldn't be independent)
-                # complexity O(1) since at most 8 neighbors
-                cant_delete.update(locked_point for locked_point in point.neighbors)
+                cant_delete.update(neighbors)
 
         # delete points one by one
         # complexity O(n) (O(1) for each point to delete)
-        for point_to_delete in points_to_delete:
-            points_around: set[Point] = point_to_delete.neighbors
-            triangles_to_remove: set[Triangle] = point_to_delete.triangles
-
-            # make a hole
-            self.triangles -= triangles_to_remove
-            self.points.remove(point_to_delete)  # at most 8 triangles
+        for v in points_to_delete:
+            # make a hole and triangulate it, the hole is star-shaped with at most 8 vertices
+            hole = dcel.remove_vertex(v)
+            dcel.triangulate_face(hole)
+            profiling.count('remove_points.holes')
 
-            # update Points around the hole
-            for point in points_around:  # at most 8 points around
-                point.neighbors -= points_around
-                point.neighbors.remove(point_to_delete)
-
-                point.triangles -= point_to_delete.triangles
-
-            # triangulate the hole
-            # complexity O(n log n) but here n <= 8 so still O(1)
-            hole = TriangulatedPointSet(list(points_around))
-            hole.triangulate()
-            self.triangles.update(hole.triangles)
+        self.points = [self.vertices[v] for v in dcel.vertices().tolist()]
+        self.__update_triangles()
 
     def visualize(self, name=None, point=None, result_triangle=None):
+        from bitalg.visualizer.main import Visualizer
+
         vis = Visualizer()
         vis.add_point([(p.x, p.y) for p in self.points])
+        segments = []
         for triangle in self.triangles:
-            vis.add_line_segment((triangle.a.to_tuple(), triangle.b.to_tuple()))
-            vis.add_line_segment((triangle.b.to_tuple(), triangle.c.to_tuple()))
-            vis.add_line_segment((triangle.c.to_tuple(), triangle.a.to_tuple()))
+            segments.append((triangle.a.to_tuple(), triangle.b.to_tuple()))
+            segments.append((triangle.b.to_tuple(), triangle.c.to_tuple()))
+            segments.append((triangle.c.to_tuple(), triangle.a.to_tuple()))
+        if segments:
+            vis.add_line_segment(segments)
 
         if point is not None:
             vis.add_point((point.x, point.y), color="red")
@@ -0,0 +1,141 @@
+"""
+Inspection and compaction of Kirkpatrick's hierarchy built by preprocess.
+
+A triangle which doesn't touch the removed points is kept by the next level, so the hierarchy has chains
+of nodes with the same triangle, each the only child of the previous one. compact replaces every chain
+with its last node and can reorder children, so locate checks the most probable child first.
+"""
+from __future__ import annotations
+
+from collections import Counter
+
+from bitalg.geometry.primitives import Point
+from bitalg.project.figures import Node, Triangle
+
+
+def _key(triangle: Triangle):
+    # the same triangle may have its vertices in another order on another level
+    return tuple(sorted(point.to_tuple() for point in triangle.to_tuple()))
+
+
+def _area(triangle: Triangle):
+    a, b, c = triangle.to_tuple()
+    return abs((b.x - a.x) * (c.y - a.y) - (b.y - a.y) * (c.x - a.x)) / 2
+
+
+def nodes(root: Node) -> list[Node]:
+    """
+    :return: distinct nodes of the hierarchy, parents before their children
+    """
+    # reversed postorder of the depth-first search
+    seen, order = {id(root)}, []
+    stack = [(root, iter(root.children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append((child, iter(child.children)))
+                break
+        else:
+            order.append(node)
+            stack.pop()
+    return order[::-1]
+
+
+def levels(root: Node) -> list[list[Node]]:
+    """
+    :return: distinct nodes reached after 0, 1, 2, ... steps from the root
+    """
+    result, level = [], [root]
+    while level:
+        result.append(level)
+        level = list({id(child): child for node in level for child in node.children}.values())
+    return result
+
+
+def statistics(root: Node) -> dict:
+    """
+    :return: dictionary with
+             'levels' - number of triangles on every level, starting from the root,
+             'nodes', 'edges' - size of the hierarchy (shared nodes counted once),
+             'fanout' - histogram {number of children: number of nodes},
+             'shared' - number of nodes with more than one parent (roots of shared subtrees),
+             'duplicates' - number of nodes whose triangle is also the triangle of another node
+    """
+    distinct = nodes(root)
+    parents = Counter(id(child) for node in distinct for child in node.children)
+    triangles = Counter(_key(node.triangle) for node in distinct)
+    return {'levels': [len(level) for level in levels(root)],
+            'nodes': len(distinct),
+            'edges': sum(len(node.children) for node in distinct),
+            'fanout': dict(sorted(Counter(len(node.children) for node in distinct).items())),
+            'shared': sum(count > 1 for count in parents.values()),
+            'duplicates': sum(count - 1 for count in triangles.values())}
+
+
+def hits(root: Node, queries: list[Point]) -> Counter:
+    """
+    :return: number of queries whose search (as in locate) passes through each node, keyed by id of the node
+    """
+    counter = Counter()
+    cover = root.triangle.to_tuple()
+    for point in queries:
+        node = root
+        if not node.triangle.contains_point(point):
+            continue
+        counter[id(node)] += 1
+        while node.children:
+            chosen = None
+            for child in node.children:
+                if child.triangle.contains_point(point):
+                    chosen = child
+                    if not any(vertex in cover for vertex in child.triangle.to_tuple()):
+                        break
+            if chosen is None:
+                break
+            node = chosen
+            counter[id(node)] += 1
+    return counter
+
+
+def compact(root: Node, order=None, queries: list[Point] = None) -> Node:
+    """
+    Removes repeated triangles from the hierarchy in place: a node whose only child has the same triangle
+    is replaced by the child, and nodes with the same triangle are merged into one.
+    Located triangles don't change, except for points on a common edge of triangles when children are reordered.
+    :param root: root of the hierarchy (result of preprocess)
+    :param order: None to keep the order of children, 'area' to check larger triangles first,
+                  'hits' to check first the children visited by more of the queries
+    :param queries: sample of queries for order='hits'
+    :return: root of the compacted hierarchy
+    """
+    if order not in (None, 'area', 'hits'):
+        raise ValueError(f"unknown order {order!r}, expected None, 'area' or 'hits'")
+    if order == 'hits' and queries is None:
+        raise ValueError("order='hits' requires queries")
+
+    # children come before parents, so every chain is already replaced with its last node
+    replacement: dict[int, Node] = {}
+    canonical: dict[tuple, Node] = {}
+    for node in reversed(nodes(root)):
+        children = []
+        for child in node.children:
+            child = replacement[id(child)]
+            if all(child is not other for other in children):
+                children.append(child)
+        node.children = children
+        if len(children) == 1 and _key(children[0].triangle) == _key(node.triangle):
+            replacement[id(node)] = children[0]
+        else:
+            replacement[id(node)] = canonical.setdefault((_key(node.triangle), tuple(map(id, children))), node)
+    root = replacement[id(root)]
+
+    if order is not None:
+        counter = hits(root, queries) if order == 'hits' else None
+        for node in nodes(root):
+            if order == 'area':
+                node.children.sort(key=lambda child: _area(child.triangle), reverse=True)
+            else:
+                node.children.sort(key=lambda child: counter[id(child)], reverse=True)
+    return root
@@ -1,37 +1,42 @@
+from __future__ import annotations
+
 import copy
 import random
 
-from figures import Point, Node, TriangulatedPointSet
+from bitalg import profiling
+from bitalg.project.figures import Point, Node, Triangle, TriangulatedPointSet
 
 
-def preprocess(points: list[Point]) -> Node:
-    # preprocess the list of points into a graph
+def preprocess(points: list[Point], visualize=True, seed=0) -> Node:
+    # preprocess the list of points into a graph, seed fixes the insertion order of the triangulation
 
-    triangulated_point_set = TriangulatedPointSet(points)
+    triangulated_point_set = TriangulatedPointSet(points, seed)
 
     i = 0
     previous_nodes: list[Node] = []
     while len(triangulated_point_set.triangles) > 1 or i == 0:
         # if this is the first step - cover the point set in a triangle and triangulate
         # otherwise remove independent set of points and triangulate the holes
-        if i != 0:
-            triangulated_point_set.remove_points()
-        else:
-            triangulated_point_set.cover_with_triangle()
-            triangulated_point_set.triangulate()
-        triangulated_point_set.visualize("step" + str(i))
+        with profiling.timer('preprocess.triangulation'):
+            if i != 0:
+                triangulated_point_set.remove_points()
+            else:
+                triangulated_point_set.cover_with_triangle()
+                triangulated_point_set.triangulate()
+        if visualize:
+            triangulated_point_set.visualize("step" + str(i))
 
         current_nodes = []
-        for triangle in triangulated_point_set.triangles:
-            # each triangle from current triangulation is a node
-            node = Node(triangle)
-            current_nodes.append(node)
+        with profiling.timer('preprocess.linking'):
+            for triangle in triangulated_point_set.triangles:
+                # each triangle from current triangulation is a node
+                node = Node(triangle)
+                current_nodes.append(node)
 
-            # add node as child to one of the previous nodes the area of its triangle belonged to
-            for previous_node in previous_nodes:
-                if triangle.contains_point(previous_node.triangle.a) or triangle.contains_point(
-                        previous_node.triangle.b) or triangle.contains_point(previous_node.triangle.c):
-                    node.children.append(previous_node)
+                # add as children all previous nodes whose triangles overlap the triangle of the node
+                for previous_node in previous_nodes:
+                    if triangle.overlaps(previous_node.triangle):
+                        node.children.append(previous_node)
 
         previous_nodes = current_nodes
         i += 1
@@ -40,8 +45,8 @@ def preprocess(points: list[Point]) -> Node:
     return root
 
 
-def locate_point(points: list[Point], point: Point):
-    root = preprocess(points)
+def locate(root: Node, point: Point) -> Triangle | None:
+    # find the triangle of the preprocessed point set containing the point
 
     curr_node = root
     if not curr_node.triangle.contains_point(point):
@@ -49,6 +54,7 @@ def locate_point(points: list[Point], point: Point):
 
     children: list[Node] = curr_node.children
     while children:
+        parent = curr_node
         for node in children:
             if node.triangle.contains_point(point):
                 curr_node = node
@@ -56,6 +62,9 @@ def locate_point(points: list[Point], point: Point):
                 if not any(pnt in root.triangle.to_tuple() for pnt in node.triangle.to_tuple()):
                     break
 
+        if curr_node is parent:
+            # numerically no child contains the point, the last found triangle is the answer
+            break
         children = curr_node.children
 
     if any(pnt in root.triangle.to_tuple() for pnt in curr_node.triangle.to_tuple()):
@@ -64,6 +73,10 @@ def locate_point(points: list[Point], point: Point):
     return curr_node.triangle
 
 
+def locate_point(points: list[Point], point: Point):
+    return locate(preprocess(points), point)
+
+
 def test(seed=None, from_x=0, to_x=10, from_y=0, to_y=10, how_many=10, search_for=None):
     if seed is not None:
         random.seed(seed)
@@ -93,4 +106,5 @@ trivial_points = [
     Point(6, 6)
 ]
 
-test(seed=69420, search_for=Point(6, 4))
\ No newline at end of file
+if __name__ == "__main__":
+    test(seed=69420, search_for=Point(6, 4))
\ No newline at end of file
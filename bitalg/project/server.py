@@ -0,0 +1,208 @@
+"""
+Point location as a local service. Clients connect over TCP and send one query per line ("x y"),
+the server answers every line in order with the located triangle ("ax ay bx by cx cy") or "None".
+Queries from all connections are collected into micro-batches, closed when max_batch queries arrive
+or max_delay seconds pass since the first one, and every batch is located in one vectorized pass.
+
+    python -m bitalg.project.server
+runs a benchmark of a few batching settings on random points.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from time import perf_counter
+
+import numpy as np
+
+from bitalg.project.batch import FlatHierarchy
+from bitalg.project.figures import Node, Point
+from bitalg.project.main import preprocess
+
+
+class LocationServer:
+    def __init__(self, root: Node, max_batch=256, max_delay=0.002):
+        """
+        :param root: root of a preprocessed point set (result of preprocess)
+        :param max_batch: maximal number of queries in one batch
+        :param max_delay: maximal time in seconds the first query of a batch waits for others
+        """
+        self.hierarchy = FlatHierarchy(root)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.latencies: list[float] = []
+        self.batch_sizes: list[int] = []
+        self.first_query = self.last_answer = None
+        self._queue: asyncio.Queue = None
+        self._batcher: asyncio.Task = None
+        self._server: asyncio.AbstractServer = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        :return: (host, port) the server listens on, port 0 picks a free one
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batches())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        self._server.close()
+        # closed connections stop reading, drop the unanswered queries and finish
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._batcher.cancel()
+
+    async def locate(self, x: float, y: float):
+        """
+        :return: id of the node of the hierarchy containing the point, -1 if it lies outside of the point set
+        """
+        if self.first_query is None:
+            self.first_query = perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((x, y, future, perf_counter()))
+        return await future
+
+    async def _batches(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # queries which arrived meanwhile are taken without waiting
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # queries of disconnected clients are cancelled, they aren't located
+            batch = [query for query in batch if not query[2].done()]
+            if not batch:
+                continue
+            result = self.hierarchy.locate([(x, y) for x, y, _, _ in batch])
+            done = perf_counter()
+            for (_, _, future, arrived), node in zip(batch, result.tolist()):
+                if not future.done():
+                    future.set_result(node)
+                self.latencies.append(done - arrived)
+            self.batch_sizes.append(len(batch))
+            self.last_answer = done
+            # a full queue never suspends the loop, connections get the answers before the next batch
+            await asyncio.sleep(0)
+
+    def _format(self, node):
+        if node < 0:
+            return "None"
+        return " ".join(f"{x!r} {y!r}" for x, y in self.hierarchy.triangles[node].tolist())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # answers are written in the order of queries, while later queries are already being located
+        answers = asyncio.Queue()
+        self._connections[asyncio.current_task()] = writer
+
+        async def write():
+            while (pending := await answers.get()) is not None:
+                if writer.is_closing():
+                    # the client is gone, the remaining answers are dropped
+                    pending.cancel()
+                    continue
+                try:
+                    writer.write((self._format(await pending) + "\n").encode())
+                except ValueError as error:
+                    writer.write(f"ERROR {error}\n".encode())
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    writer.close()
+
+        writer_task = asyncio.create_task(write())
+        try:
+            while not writer.is_closing() and (line := await reader.readline()):
+                try:
+                    x, y = map(float, line.split())
+                except ValueError:
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_exception(ValueError(f"expected 'x y', got {line.decode().strip()!r}"))
+                    await answers.put(future)
+                    continue
+                await answers.put(asyncio.ensure_future(self.locate(x, y)))
+        except ConnectionError:
+            pass
+        finally:
+            await answers.put(None)
+            await writer_task
+            writer.close()
+            del self._connections[asyncio.current_task()]
+
+    def stats(self):
+        """
+        :return: number of queries, p50 and p99 latency [s], throughput [queries/s] and mean batch size
+        """
+        latencies = np.array(self.latencies)
+        duration = (self.last_answer - self.first_query) if self.latencies else 0.0
+        return {'queries': len(latencies),
+                'p50': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                'p99': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+                'throughput': len(latencies) / duration if duration > 0 else 0.0,
+                'batch': float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0}
+
+    def reset_stats(self):
+        self.latencies, self.batch_sizes = [], []
+        self.first_query = self.last_answer = None
+
+
+async def _client(host, port, queries, window):
+    # sends queries keeping at most window of them unanswered
+    reader, writer = await asyncio.open_connection(host, port)
+    unanswered = asyncio.Semaphore(window)
+    answers = []
+
+    async def read():
+        for _ in queries:
+            answers.append((await reader.readline()).decode().strip())
+            unanswered.release()
+
+    reading = asyncio.create_task(read())
+    for x, y in queries:
+        await unanswered.acquire()
+        writer.write(f"{x!r} {y!r}\n".encode())
+        await writer.drain()
+    await reading
+    writer.close()
+    return answers
+
+
+async def _benchmark(root, settings, clients, queries, window, seed):
+    rng = np.random.default_rng(seed)
+    print(f"{'batch':>6} {'delay [ms]':>10} {'p50 [ms]':>9} {'p99 [ms]':>9} {'queries/s':>10} {'mean batch':>10}")
+    for max_batch, max_delay in settings:
+        server = LocationServer(root, max_batch, max_delay)
+        host, port = await server.start()
+        await asyncio.gather(*(_client(host, port, rng.uniform(0, 10, (queries, 2)).tolist(), window)
+                               for _ in range(clients)))
+        stats = server.stats()
+        await server.stop()
+        print(f"{max_batch:>6} {max_delay * 1e3:>10.1f} {stats['p50'] * 1e3:>9.2f} {stats['p99'] * 1e3:>9.2f} "
+              f"{stats['throughput']:>10.0f} {stats['batch']:>10.1f}")
+
+
+def benchmark(n=200, settings=((1, 0.0), (32, 0.001), (256, 0.002), (1024, 0.005)), clients=8, queries=2000,
+              window=64, seed=0):
+    """
+    Runs the server on random points in [0, 10] x [0, 10] and queries it from several clients
+    for every (max_batch, max_delay) setting.
+    """
+    random.seed(seed)
+    root = preprocess([Point(random.uniform(0, 10), random.uniform(0, 10)) for _ in range(n)], visualize=False)
+    asyncio.run(_benchmark(root, settings, clients, queries, window, seed))
+
+
+if __name__ == "__main__":
+    benchmark()
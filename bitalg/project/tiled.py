@@ -0,0 +1,483 @@
+"""
+Out-of-core Delaunay triangulation and point location for point sets larger than memory.
+
+Coordinates are read from a memory-mapped file (.npy of shape (n, 2) or raw float64 x, y pairs) and split
+by a grid into tiles, kept in files of the working directory. Every tile is triangulated together with
+the points lying in a margin around it. A triangle of a tile is certified (it is a triangle of the whole
+triangulation) when its circumcircle, clipped to the convex hull of all points, lies inside the tile
+with its margin: no point outside of the margin can lie in the circle. Each tile owns the certified
+triangles whose centroid lies in it, so no triangle is repeated. Owned triangles of all tiles are then
+stitched: tiles whose part of the convex hull is not covered are triangulated again with a doubled margin.
+Points are assumed to be in general position (no four points on a circle).
+
+    TiledTriangulation.build('survey.npy', 'survey_tiles')
+    tiled = TiledTriangulation('survey_tiles')
+    tiled.locate(queries)  # global vertex ids of the triangles containing the queries
+
+The grid of tiles (index.json in the working directory) routes every query to the tile containing it.
+"""
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from bitalg.geometry.delaunay import Delaunay
+from bitalg.geometry.kdtree import KDTree, hull_candidates
+from bitalg.geometry.primitives import EPS
+
+
+def open_points(path) -> np.ndarray:
+    """
+    :param path: .npy file with array of shape (n, 2) or raw file of float64 x, y pairs
+    :return: read-only memory-mapped array of shape (n, 2)
+    """
+    if str(path).endswith('.npy'):
+        points = np.load(path, mmap_mode='r')
+    else:
+        points = np.memmap(path, dtype=np.float64, mode='r')
+    return points.reshape(-1, 2)
+
+
+def _chunks(n, chunk_size):
+    for start in range(0, n, chunk_size):
+        yield start, min(start + chunk_size, n)
+
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _convex_hull(points) -> np.ndarray:
+    # counterclockwise vertices of the convex hull (monotone chain), without collinear points
+    points = np.unique(points[hull_candidates(points)], axis=0)
+    if len(points) < 3:
+        return points
+
+    def chain(points):
+        hull = []
+        for point in points:
+            while len(hull) >= 2 and _cross(hull[-2], hull[-1], point) <= 0:
+                hull.pop()
+            hull.append(point)
+        return hull
+
+    points = points.tolist()
+    lower, upper = chain(points), chain(points[::-1])
+    return np.array(lower[:-1] + upper[:-1], dtype=np.float64).reshape(-1, 2)
+
+
+def _clip(polygon, lower, upper):
+    # Sutherland-Hodgman clipping of a convex polygon (list of (x, y)) to a rectangle
+    for axis, bound, sign in ((0, lower[0], 1), (0, upper[0], -1), (1, lower[1], 1), (1, upper[1], -1)):
+        clipped = []
+        for i, current in enumerate(polygon):
+            previous = polygon[i - 1]
+            current_in = sign * (current[axis] - bound) >= 0
+            previous_in = sign * (previous[axis] - bound) >= 0
+            if current_in != previous_in:
+                t = (bound - previous[axis]) / (current[axis] - previous[axis])
+                clipped.append((previous[0] + t * (current[0] - previous[0]),
+                                previous[1] + t * (current[1] - previous[1])))
+            if current_in:
+                clipped.append(current)
+        polygon = clipped
+        if not polygon:
+            break
+    return polygon
+
+
+def _area(polygon):
+    return sum(_cross((0, 0), a, b) for a, b in zip(polygon, polygon[1:] + polygon[:1])) / 2
+
+
+class TileGrid:
+    """
+    Regular grid of tiles over the bounding box of the points, tile id is row * columns + column
+    """
+
+    def __init__(self, lower, upper, shape):
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.shape = np.asarray(shape, dtype=np.int64)
+        self.size = np.maximum((self.upper - self.lower) / self.shape, np.finfo(np.float64).tiny)
+
+    def __len__(self):
+        return int(self.shape.prod())
+
+    def tile_of(self, points) -> np.ndarray:
+        """
+        :param points: array of shape (n, 2)
+        :return: ids of tiles containing the points (points outside of the grid go to the nearest tile)
+        """
+        cells = np.floor((np.asarray(points, dtype=np.float64).reshape(-1, 2) - self.lower) / self.size)
+        cells = np.clip(cells, 0, self.shape - 1).astype(np.int64)
+        return cells[:, 1] * self.shape[0] + cells[:, 0]
+
+    def core(self, tile):
+        """
+        :return: (lower left, upper right) corner of the tile
+        """
+        cell = np.array([tile % self.shape[0], tile // self.shape[0]])
+        return self.lower + cell * self.size, self.lower + (cell + 1) * self.size
+
+    def tiles_in(self, lower, upper) -> list[int]:
+        """
+        :return: ids of tiles intersecting the rectangle
+        """
+        low = np.clip(np.floor((np.asarray(lower) - self.lower) / self.size), 0, self.shape - 1).astype(np.int64)
+        high = np.clip(np.floor((np.asarray(upper) - self.lower) / self.size), 0, self.shape - 1).astype(np.int64)
+        return [int(row * self.shape[0] + column)
+                for row in range(low[1], high[1] + 1) for column in range(low[0], high[0] + 1)]
+
+
+class _TileLocator:
+    # triangulation of a tile with its margin and the walk locating points in it
+
+    def __init__(self, data):
+        self.points = data['points']
+        self.ids = data['ids']
+        self.simplices = data['simplices']
+        self.neighbors = data['neighbors']
+        self.certified = data['certified']
+        # certified triangles of other tiles reaching into this one
+        self.foreign = data['foreign']
+        self.foreign_ids = data['foreign_ids']
+        self.vertex_triangle = np.full(len(self.points), -1, dtype=np.int64)
+        self.vertex_triangle[self.simplices.ravel()] = np.repeat(np.arange(len(self.simplices)), 3)
+        used = np.nonzero(self.vertex_triangle >= 0)[0]
+        self.used = used
+        self.tree = KDTree(self.points[used]) if len(used) else None
+
+    def _walk(self, t, x, y):
+        points, simplices, neighbors = self.points, self.simplices, self.neighbors
+        for _ in range(len(simplices)):
+            vertices = simplices[t]
+            for i in range(3):
+                a, b = points[vertices[(i + 1) % 3]], points[vertices[(i + 2) % 3]]
+                if (b[0] - a[0]) * (y - a[1]) - (b[1] - a[1]) * (x - a[0]) < 0:
+                    t = neighbors[t][i]
+                    break
+            else:
+                return t
+            if t < 0:
+                return -1
+        return -1
+
+    def _scan(self, x, y):
+        """
+        Containment test (as Triangle.contains_point) against all certified triangles, also of other tiles
+        :return: global point indices of the triangle containing the point, None if there is no such triangle
+        """
+        certified = np.nonzero(self.certified)[0]
+        triangles = np.concatenate([self.points[self.simplices[certified]], self.foreign])
+        dets = np.stack([(triangles[:, i, 0] - x) * (triangles[:, (i + 1) % 3, 1] - y) -
+                         (triangles[:, i, 1] - y) * (triangles[:, (i + 1) % 3, 0] - x) for i in range(3)], axis=1)
+        found = np.nonzero((dets > -EPS).all(axis=1))[0]
+        if not len(found):
+            return None
+        if found[0] < len(certified):
+            return self.ids[self.simplices[certified[found[0]]]]
+        return self.foreign_ids[found[0] - len(certified)]
+
+    def locate(self, queries) -> np.ndarray:
+        """
+        :return: array of shape (m, 3) of global point indices of triangles containing the queries, rows of -1
+                 for queries outside of the point set
+        """
+        result = np.full((len(queries), 3), -1, dtype=np.int64)
+        starts = np.full(len(queries), -1, dtype=np.int64)
+        if self.tree is not None:
+            _, nearest = self.tree.knn(queries, 1)
+            starts = self.vertex_triangle[self.used[nearest[:, 0]]]
+        for i, ((x, y), start) in enumerate(zip(queries.tolist(), starts.tolist())):
+            t = self._walk(start, x, y) if start >= 0 else -1
+            if t >= 0 and self.certified[t]:
+                result[i] = self.ids[self.simplices[t]]
+                continue
+            # the triangle belongs to another tile or the query lies on the boundary of the found one
+            found = self._scan(x, y)
+            if found is not None:
+                result[i] = found
+        return result
+
+
+class TiledTriangulation:
+    def __init__(self, directory, max_loaded=16):
+        """
+        :param directory: working directory of build
+        :param max_loaded: number of tiles kept in memory, the least recently used are dropped
+        """
+        self.directory = directory
+        with open(os.path.join(directory, 'index.json')) as file:
+            index = json.load(file)
+        self.points = open_points(index['points'])
+        self.grid = TileGrid(index['lower'], index['upper'], index['shape'])
+        self.hull = np.array(index['hull'], dtype=np.float64).reshape(-1, 2)
+        self.tiles = index['tiles']
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()
+
+    @classmethod
+    def build(cls, points_path, directory, tile_points=10 ** 5, overlap=0.1, chunk_size=10 ** 6, seed=None):
+        """
+        :param points_path: file of coordinates, see open_points
+        :param directory: working directory for tiles and results
+        :param tile_points: expected number of points in a tile
+        :param overlap: initial margin around a tile as a fraction of the tile size
+        :param chunk_size: number of points read at once
+        :param seed: seed of the insertion order of Delaunay triangulations
+        :return: TiledTriangulation
+        """
+        points = open_points(points_path)
+        n = len(points)
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.startswith('tile_') or name == 'triangles.bin':
+                os.remove(os.path.join(directory, name))
+
+        # bounding box and convex hull
+        lower, upper = np.full(2, np.inf), np.full(2, -np.inf)
+        hull = np.empty((0, 2))
+        for start, stop in _chunks(n, chunk_size):
+            chunk = np.asarray(points[start:stop], dtype=np.float64)
+            lower, upper = np.minimum(lower, chunk.min(axis=0)), np.maximum(upper, chunk.max(axis=0))
+            hull = _convex_hull(np.concatenate([hull, chunk]))
+
+        extent = np.maximum(upper - lower, np.finfo(np.float64).tiny)
+        tiles = max(1, -(-n // tile_points))
+        columns = max(1, int(round(np.sqrt(tiles * extent[0] / extent[1]))))
+        grid = TileGrid(lower, upper, (columns, max(1, -(-tiles // columns))))
+
+        # points of every tile with their indices
+        for start, stop in _chunks(n, chunk_size):
+            chunk = np.asarray(points[start:stop], dtype=np.float64)
+            ids = grid.tile_of(chunk)
+            order = np.argsort(ids, kind='stable')
+            bounds = np.searchsorted(ids[order], np.arange(len(grid) + 1))
+            for tile in np.nonzero(np.diff(bounds))[0].tolist():
+                part = order[bounds[tile]:bounds[tile + 1]]
+                with open(os.path.join(directory, f'tile_{tile}.xy'), 'ab') as file:
+                    chunk[part].tofile(file)
+                with open(os.path.join(directory, f'tile_{tile}.ids'), 'ab') as file:
+                    (part + start).astype(np.int64).tofile(file)
+
+        polygon = [tuple(point) for point in hull.tolist()]
+        margins = [overlap * float(grid.size.max())] * len(grid)
+        results = [None] * len(grid)
+        rebuild = list(range(len(grid)))
+        while rebuild:
+            for tile in rebuild:
+                results[tile] = _triangulate_tile(directory, grid, tile, hull, polygon, margins[tile], seed)
+            rebuild = _stitch(directory, grid, polygon, results)
+            for tile in rebuild:
+                margins[tile] *= 2
+
+        with open(os.path.join(directory, 'triangles.bin'), 'wb') as file:
+            for tile in range(len(grid)):
+                with np.load(os.path.join(directory, f'tile_{tile}.npz')) as data:
+                    data['ids'][data['simplices'][data['owned']]].astype(np.int64).tofile(file)
+        metadata = [{'points': result['points'], 'margin': result['margin'], 'triangles': result['triangles']}
+                    for result in results]
+        with open(os.path.join(directory, 'index.json'), 'w') as file:
+            json.dump({'points': os.path.abspath(points_path), 'lower': lower.tolist(), 'upper': upper.tolist(),
+                       'shape': grid.shape.tolist(), 'hull': hull.tolist(), 'tiles': metadata}, file)
+        return cls(directory)
+
+    def triangles(self) -> np.ndarray:
+        """
+        :return: memory-mapped array of shape (m, 3) of global point indices of all triangles, counterclockwise
+        """
+        path = os.path.join(self.directory, 'triangles.bin')
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.zeros((0, 3), dtype=np.int64)
+        return np.memmap(path, dtype=np.int64, mode='r').reshape(-1, 3)
+
+    def _tile(self, tile) -> _TileLocator:
+        if tile in self._loaded:
+            self._loaded.move_to_end(tile)
+            return self._loaded[tile]
+        data = {}
+        for name in (f'tile_{tile}.npz', f'tile_{tile}.foreign.npz'):
+            with np.load(os.path.join(self.directory, name)) as file:
+                prefix = 'foreign_' if 'foreign' in name else ''
+                data.update({prefix + key: file[key] for key in file.files})
+        data['foreign'] = data.pop('foreign_triangles')
+        locator = _TileLocator(data)
+        self._loaded[tile] = locator
+        if len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+        return locator
+
+    def locate(self, queries) -> np.ndarray:
+        """
+        :param queries: array of shape (m, 2)
+        :return: array of shape (m, 3) of global point indices of the triangles containing the queries,
+                 rows of -1 for queries outside of the convex hull
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        result = np.full((len(queries), 3), -1, dtype=np.int64)
+        inside = np.nonzero(((queries >= self.grid.lower - EPS) & (queries <= self.grid.upper + EPS)).all(axis=1))[0]
+        tiles = self.grid.tile_of(queries[inside])
+        for tile in np.unique(tiles).tolist():
+            group = inside[tiles == tile]
+            locator = self._tile(tile)
+            result[group] = locator.locate(queries[group])
+        return result
+
+
+def _circle_hull_box(center, radius, vertices, hull):
+    """
+    Bounding boxes of the intersections of circles with the convex hull (counterclockwise polygon).
+    Candidates for extreme points are the given points on the circles (vertices of the triangles),
+    hull vertices inside the circles, crossings of hull edges with the circles and extreme points
+    of the circles inside the hull.
+    """
+    start, edge = hull, np.roll(hull, -1, axis=0) - hull
+    candidates = [vertices]
+
+    inside = np.hypot(*(hull[None, :, :] - center[:, None, :]).transpose(2, 0, 1)) <= radius
+    candidates.append(np.where(inside[:, :, None], hull[None, :, :], np.nan))
+
+    # |start + t * edge - center| = radius for t in [0, 1]
+    offset = start[None, :, :] - center[:, None, :]
+    a = (edge ** 2).sum(axis=1)[None, :]
+    b = 2 * (offset * edge[None, :, :]).sum(axis=2)
+    c = (offset ** 2).sum(axis=2) - radius ** 2
+    discriminant = b ** 2 - 4 * a * c
+    root = np.sqrt(np.where(discriminant >= 0, discriminant, np.nan))
+    for t in ((-b - root) / (2 * a), (-b + root) / (2 * a)):
+        t = np.where((t >= 0) & (t <= 1), t, np.nan)
+        candidates.append(start[None, :, :] + t[:, :, None] * edge[None, :, :])
+
+    extremes = center[:, None, :] + radius[:, :, None] * np.array([[1, 0], [-1, 0], [0, 1], [0, -1]])
+    sides = (edge[None, None, :, 0] * (extremes[:, :, None, 1] - start[None, None, :, 1]) -
+             edge[None, None, :, 1] * (extremes[:, :, None, 0] - start[None, None, :, 0]))
+    scale = max(float(np.abs(hull).max()), 1.0) ** 2
+    candidates.append(np.where((sides >= -1e-12 * scale).all(axis=2)[:, :, None], extremes, np.nan))
+
+    candidates = np.concatenate(candidates, axis=1)
+    return np.nanmin(candidates, axis=1), np.nanmax(candidates, axis=1)
+
+
+def _certified(points, simplices, lower, upper, grid, hull, chunk_size=10 ** 6):
+    """
+    Triangles whose circumcircle, clipped to the region where points may lie, is inside the rectangle.
+    The region is the bounding box of all points, or the convex hull for triangles failing the first test.
+    """
+    a, b, c = points[simplices[:, 0]], points[simplices[:, 1]], points[simplices[:, 2]]
+    d = 2 * (a[:, 0] * (b[:, 1] - c[:, 1]) + b[:, 0] * (c[:, 1] - a[:, 1]) + c[:, 0] * (a[:, 1] - b[:, 1]))
+    sa, sb, sc = (a ** 2).sum(axis=1), (b ** 2).sum(axis=1), (c ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        center = np.column_stack([sa * (b[:, 1] - c[:, 1]) + sb * (c[:, 1] - a[:, 1]) + sc * (a[:, 1] - b[:, 1]),
+                                  sa * (c[:, 0] - b[:, 0]) + sb * (a[:, 0] - c[:, 0]) + sc * (b[:, 0] - a[:, 0])]) / d[:, None]
+    radius = np.hypot(*(a - center).T)[:, None] * (1 + 1e-9)
+    valid = np.isfinite(radius[:, 0])
+    low = np.maximum(center - radius, grid.lower)
+    high = np.minimum(center + radius, grid.upper)
+    certified = valid & (low >= lower).all(axis=1) & (high <= upper).all(axis=1)
+
+    # triangles near the convex hull have large circles reaching out of it
+    retry = np.nonzero(valid & ~certified)[0]
+    if len(hull) >= 3 and len(retry):
+        step = max(1, chunk_size // (len(hull) * 8))
+        for first in range(0, len(retry), step):
+            part = retry[first:first + step]
+            vertices = np.stack([a[part], b[part], c[part]], axis=1)
+            low, high = _circle_hull_box(center[part], radius[part], vertices, hull)
+            certified[part] = (low >= lower).all(axis=1) & (high <= upper).all(axis=1)
+    return certified
+
+
+def _covered_area(points, simplices, lower, upper):
+    # area of the part of the rectangle covered by the triangles
+    triangles = points[simplices]
+    low, high = triangles.min(axis=1), triangles.max(axis=1)
+    inside = (low >= lower).all(axis=1) & (high <= upper).all(axis=1)
+    crossing = ~inside & (high > lower).all(axis=1) & (low < upper).all(axis=1)
+    a, b, c = triangles[inside, 0], triangles[inside, 1], triangles[inside, 2]
+    area = (_cross(a.T, b.T, c.T) / 2).sum()
+    for triangle in triangles[crossing].tolist():
+        area += _area(_clip([tuple(point) for point in triangle], lower, upper))
+    return area
+
+
+def _read_tiles(directory, tiles):
+    xy = [np.fromfile(os.path.join(directory, f'tile_{tile}.xy'), dtype=np.float64).reshape(-1, 2)
+          for tile in tiles if os.path.exists(os.path.join(directory, f'tile_{tile}.xy'))]
+    ids = [np.fromfile(os.path.join(directory, f'tile_{tile}.ids'), dtype=np.int64)
+           for tile in tiles if os.path.exists(os.path.join(directory, f'tile_{tile}.ids'))]
+    if not xy:
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64)
+    return np.concatenate(xy), np.concatenate(ids)
+
+
+def _triangulate_tile(directory, grid, tile, hull, polygon, margin, seed):
+    """
+    Triangulates the points of the tile with the given margin around it. Certified triangles whose centroid
+    lies in the tile are owned by it.
+    :return: statistics of the tile with the owned triangles crossing its boundary and whether the certified
+             triangles cover the part of the convex hull lying in the tile
+    """
+    core_lower, core_upper = grid.core(tile)
+    lower, upper = core_lower - margin, core_upper + margin
+    points, ids = _read_tiles(directory, grid.tiles_in(lower, upper))
+    near = ((points >= lower) & (points <= upper)).all(axis=1)
+    points, ids = points[near], ids[near]
+
+    triangulation = Delaunay(points, seed=seed)
+    simplices, neighbors = triangulation.simplices, triangulation.neighbors
+    certified = _certified(points, simplices, lower, upper, grid, hull)
+    # a repeated point is represented by its smallest index, the same in every tile
+    for duplicate, original in triangulation.duplicates.items():
+        ids[original] = min(ids[original], ids[duplicate])
+
+    triangles = points[simplices]
+    centroids = triangles.mean(axis=1) if len(simplices) else np.empty((0, 2))
+    owned = certified & (grid.tile_of(centroids) == tile)
+    np.savez(os.path.join(directory, f'tile_{tile}.npz'), points=points, ids=ids, simplices=simplices,
+             neighbors=neighbors, certified=certified, owned=owned)
+
+    inside = ((triangles.min(axis=1) >= core_lower) & (triangles.max(axis=1) <= core_upper)).all(axis=1)
+    a, b, c = triangles[owned & inside, 0], triangles[owned & inside, 1], triangles[owned & inside, 2]
+    target = _area(_clip(polygon, core_lower, core_upper)) if len(polygon) >= 3 else 0.0
+    everything = (lower <= grid.lower).all() and (upper >= grid.upper).all()
+    path = os.path.join(directory, f'tile_{tile}.ids')
+    return {'points': os.path.getsize(path) // 8 if os.path.exists(path) else 0,
+            'margin': float(margin), 'triangles': int(owned.sum()),
+            'area': float((_cross(a.T, b.T, c.T) / 2).sum()), 'target': target,
+            'crossing': triangles[owned & ~inside], 'crossing_ids': ids[simplices[owned & ~inside]],
+            'complete': everything or _covered_area(points, simplices[certified], core_lower, core_upper) >=
+                        target - 1e-9 * grid.size.prod()}
+
+
+def _stitch(directory, grid, polygon, results):
+    """
+    Checks that the owned triangles of all tiles cover the convex hull and saves for every tile
+    the triangles of other tiles reaching into it.
+    :return: tiles which have to be triangulated again with a larger margin
+    """
+    foreign = [[] for _ in range(len(grid))]
+    for tile, result in enumerate(results):
+        for k, triangle in enumerate(result['crossing']):
+            for other in grid.tiles_in(triangle.min(axis=0), triangle.max(axis=0)):
+                foreign[other].append((tile, k))
+
+    deficient = []
+    for tile, result in enumerate(results):
+        core_lower, core_upper = grid.core(tile)
+        covered = result['area'] + sum(_area(_clip([tuple(point) for point in results[other]['crossing'][k].tolist()],
+                                                   core_lower, core_upper))
+                                       for other, k in foreign[tile])
+        if covered < result['target'] - 1e-9 * grid.size.prod():
+            deficient.append(tile)
+        others = [(other, k) for other, k in foreign[tile] if other != tile]
+        np.savez(os.path.join(directory, f'tile_{tile}.foreign.npz'),
+                 triangles=np.array([results[other]['crossing'][k] for other, k in others]).reshape(-1, 3, 2),
+                 ids=np.array([results[other]['crossing_ids'][k] for other, k in others],
+                              dtype=np.int64).reshape(-1, 3))
+    # a missing triangle is missing in the tile of its centroid, so that tile lacks coverage and
+    # its certified triangles don't cover it, otherwise the missing triangle would be one of them
+    return [tile for tile in deficient if not results[tile]['complete']]
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import random
+
+from bitalg.project.figures import Point, Triangle, TriangulatedPointSet
+
+
+# data structures
+
+class MapSegment:
+    # segment of the map (not primitives.Segment): ends are (x, y) tuples, p is lexicographically smaller
+    # than q, payload is the face lying above the segment
+    __slots__ = ('p', 'q', 'payload')
+
+    def __init__(self, p: (float, float), q: (float, float), payload=None):
+        self.p, self.q = (p, q) if p < q else (q, p)
+        self.payload = payload
+
+    def side(self, point: (float, float)) -> float:
+        # > 0 if point lies above the segment, < 0 if below
+        (px, py), (qx, qy) = self.p, self.q
+        return (qx - px) * (point[1] - py) - (qy - py) * (point[0] - px)
+
+
+class Trapezoid:
+    # neighbours sharing top (upper) or bottom (lower) segment on the other side of the left / right wall
+    __slots__ = ('top', 'bottom', 'leftp', 'rightp', 'upper_left', 'lower_left', 'upper_right', 'lower_right',
+                 'node')
+
+    def __init__(self, top: MapSegment, bottom: MapSegment, leftp: (float, float), rightp: (float, float)):
+        self.top = top
+        self.bottom = bottom
+        self.leftp = leftp
+        self.rightp = rightp
+        self.upper_left = self.lower_left = self.upper_right = self.lower_right = None
+        self.node = None
+
+
+class Node:
+    """
+    Node of the search structure: x-node (point), y-node (segment, left is above) or leaf (trapezoid).
+    Leaves may have many parents, so a leaf is turned into an inner node in place.
+    """
+    __slots__ = ('point', 'segment', 'left', 'right', 'trapezoid')
+
+    def __init__(self, point=None, segment=None, left=None, right=None, trapezoid=None):
+        self.point = point
+        self.segment = segment
+        self.left = left
+        self.right = right
+        self.trapezoid = trapezoid
+        if trapezoid is not None:
+            trapezoid.node = self
+
+
+class TrapezoidalMap:
+    """
+    Trapezoidal decomposition of non-crossing segments with its search structure,
+    built by randomized incremental construction (expected O(n log n) time, O(log n) query depth).
+    Points are compared lexicographically, so vertical segments and equal x coordinates are allowed.
+    """
+
+    def __init__(self, segments: list[MapSegment], seed=None):
+        segments = list(segments)
+        xs = [x for segment in segments for x, _ in (segment.p, segment.q)] or [0.0]
+        ys = [y for segment in segments for _, y in (segment.p, segment.q)] or [0.0]
+        margin = max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+        low, high = (min(xs) - margin, min(ys) - margin), (max(xs) + margin, max(ys) + margin)
+        self.box = Trapezoid(MapSegment((low[0], high[1]), high), MapSegment(low, (high[0], low[1])), low, high)
+        self.root = Node(trapezoid=self.box)
+
+        random.Random(seed).shuffle(segments)
+        for segment in segments:
+            self.insert(segment)
+
+    def _query(self, point, segment: MapSegment = None) -> Node:
+        # segment decides the side when point lies on a segment of a node (segment starting at point)
+        node = self.root
+        while node.trapezoid is None:
+            if node.point is not None:
+                node = node.left if point < node.point else node.right
+            else:
+                side = node.segment.side(point)
+                if side == 0 and segment is not None:
+                    side = node.segment.side(segment.q)
+                node = node.left if side > 0 else node.right
+        return node
+
+    def depth(self, point) -> int:
+        # number of nodes on the search path of the point
+        node, depth = self.root, 1
+        while node.trapezoid is None:
+            if node.point is not None:
+                node = node.left if point < node.point else node.right
+            else:
+                node = node.left if node.segment.side(point) > 0 else node.right
+            depth += 1
+        return depth
+
+    def locate(self, point) -> Trapezoid | None:
+        """
+        :param point: (x, y) tuple
+        :return: trapezoid containing the point, None if it lies outside of the bounding box
+        """
+        point = tuple(point)
+        if not (self.box.leftp <= point <= self.box.rightp and
+                self.box.bottom.side(point) >= 0 >= self.box.top.side(point)):
+            return None
+        return self._query(point).trapezoid
+
+    def _crossed(self, segment: MapSegment) -> list[Trapezoid]:
+        trapezoids = [self._query(segment.p, segment).trapezoid]
+        while segment.q > trapezoids[-1].rightp:
+            last = trapezoids[-1]
+            trapezoids.append(last.lower_right if segment.side(last.rightp) > 0 else last.upper_right)
+        return trapezoids
+
+    def insert(self, segment: MapSegment):
+        crossed = self._crossed(segment)
+        p, q = segment.p, segment.q
+        first, last = crossed[0], crossed[-1]
+
+        left = Trapezoid(first.top, first.bottom, first.leftp, p) if p > first.leftp else None
+        right = Trapezoid(last.top, last.bottom, q, last.rightp) if q < last.rightp else None
+
+        # parts above and below the segment; a wall of a crossed trapezoid survives only on its side
+        # of the segment, on the other side neighbouring parts are merged
+        upper = Trapezoid(first.top, segment, p, None)
+        lower = Trapezoid(segment, first.bottom, p, None)
+        uppers, lowers = [upper], [lower]
+        pieces = [(upper, lower)]
+        for trapezoid in crossed[1:]:
+            if segment.side(trapezoid.leftp) > 0:
+                upper.rightp = trapezoid.leftp
+                upper = Trapezoid(trapezoid.top, segment, trapezoid.leftp, None)
+                uppers.append(upper)
+            else:
+                lower.rightp = trapezoid.leftp
+                lower = Trapezoid(segment, trapezoid.bottom, trapezoid.leftp, None)
+                lowers.append(lower)
+            pieces.append((upper, lower))
+        upper.rightp = lower.rightp = q
+
+        self._link([t for t in (left, right) if t is not None] + uppers + lowers, crossed)
+
+        # leaves of the crossed trapezoids become subtrees, every new trapezoid gets one leaf
+        for trapezoid, (above, below) in zip(crossed, pieces):
+            node = Node(segment=segment, left=above.node or Node(trapezoid=above),
+                        right=below.node or Node(trapezoid=below))
+            if trapezoid is last and right is not None:
+                node = Node(point=q, left=node, right=Node(trapezoid=right))
+            if trapezoid is first and left is not None:
+                node = Node(point=p, left=Node(trapezoid=left), right=node)
+            leaf = trapezoid.node
+            leaf.point, leaf.segment, leaf.left, leaf.right = node.point, node.segment, node.left, node.right
+            leaf.trapezoid = None
+
+    def _link(self, created, crossed):
+        # trapezoids touching the same wall point are neighbours when they share top or bottom segment
+        candidates = set(created)
+        removed = set(map(id, crossed))
+        for trapezoid in crossed:
+            for neighbor in (trapezoid.upper_left, trapezoid.lower_left, trapezoid.upper_right, trapezoid.lower_right):
+                if neighbor is not None and id(neighbor) not in removed:
+                    candidates.add(neighbor)
+
+        ending = {}
+        for trapezoid in candidates:
+            ending.setdefault(trapezoid.rightp, []).append(trapezoid)
+        for trapezoid in created:
+            for neighbor in ending.get(trapezoid.leftp, ()):
+                if neighbor.top is trapezoid.top:
+                    trapezoid.upper_left, neighbor.upper_right = neighbor, trapezoid
+                if neighbor.bottom is trapezoid.bottom:
+                    trapezoid.lower_left, neighbor.lower_right = neighbor, trapezoid
+
+        starting = {}
+        for trapezoid in candidates:
+            starting.setdefault(trapezoid.leftp, []).append(trapezoid)
+        for trapezoid in created:
+            for neighbor in starting.get(trapezoid.rightp, ()):
+                if neighbor.top is trapezoid.top:
+                    trapezoid.upper_right, neighbor.upper_left = neighbor, trapezoid
+                if neighbor.bottom is trapezoid.bottom:
+                    trapezoid.lower_right, neighbor.lower_left = neighbor, trapezoid
+
+
+def preprocess(points: list[Point], seed=None) -> TrapezoidalMap:
+    # build the trapezoidal map of the triangulation of the points covered with a triangle
+
+    triangulated_point_set = TriangulatedPointSet(points)
+    triangulated_point_set.cover_with_triangle()
+    triangulated_point_set.triangulate()
+    cover = {triangulated_point_set.triangle_left_point, triangulated_point_set.triangle_right_point,
+             triangulated_point_set.triangle_top_point}
+
+    segments = {}
+    for triangle in triangulated_point_set.triangles:
+        vertices = triangle.to_tuple()
+        # triangles touching the cover are outside of the point set, segments below them get no payload
+        outside = any(vertex in cover for vertex in vertices)
+        for a, b in zip(vertices, vertices[1:] + vertices[:1]):
+            a, b = a.to_tuple(), b.to_tuple()
+            segment = segments.setdefault((min(a, b), max(a, b)), MapSegment(a, b))
+            # triangles are counterclockwise, so the triangle lies above its edges going right
+            if a < b and not outside:
+                segment.payload = triangle
+    return TrapezoidalMap(list(segments.values()), seed)
+
+
+def locate(trapezoidal_map: TrapezoidalMap, point: Point) -> Triangle | None:
+    # find the triangle of the preprocessed point set containing the point
+
+    trapezoid = trapezoidal_map.locate(point.to_tuple())
+    if trapezoid is None:
+        return None
+    return trapezoid.bottom.payload
+
+
+def locate_point(points: list[Point], point: Point):
+    return locate(preprocess(points), point)
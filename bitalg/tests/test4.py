@@ -1,15 +1,18 @@
 import os
 
+from bitalg.geometry import primitives
 from bitalg.tests.test_core import TestCore #, get_test_path
 
 def get_test_path(lab_no, task_no, test_no):
     return f"../tests/test{lab_no}_tests/task{task_no}/test_{lab_no}_{task_no}_{test_no}"
 
 
-class Point:
+class Point(primitives.Point):
+    # points are equal when their x coordinates differ by less than eps
+    __slots__ = ('eps',)
+
     def __init__(self, x_cord, y_cord, eps):
-        self.x = x_cord
-        self.y = y_cord
+        super().__init__(x_cord, y_cord)
         self.eps = eps
 
     def __eq__(self, other):
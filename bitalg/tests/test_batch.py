@@ -0,0 +1,30 @@
+import copy
+import random
+
+import pytest
+
+from bitalg.project import main as kirkpatrick
+from bitalg.project.batch import FlatHierarchy
+from bitalg.project.figures import Point
+
+from bitalg.tests.test_point_location import GRID, key
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_locate_matches_hierarchy(seed):
+    rng = random.Random(seed)
+    points = [Point(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(200)]
+    for points in (points, GRID):
+        root = kirkpatrick.preprocess(copy.deepcopy(points), visualize=False, seed=seed)
+        queries = [Point(rng.uniform(-1, 11), rng.uniform(-1, 11)) for _ in range(500)]
+        flat = FlatHierarchy(root)
+        expected = [kirkpatrick.locate(root, point) for point in queries]
+        located = flat.locate([point.to_tuple() for point in queries])
+        assert [key(triangle) for triangle in flat.locate_points([point.to_tuple() for point in queries])] == \
+               [key(triangle) for triangle in expected]
+        assert [i >= 0 for i in located.tolist()] == [triangle is not None for triangle in expected]
+
+
+def test_empty_batch():
+    flat = FlatHierarchy(kirkpatrick.preprocess(copy.deepcopy(GRID), visualize=False))
+    assert flat.locate([]).tolist() == []
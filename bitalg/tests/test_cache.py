@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from bitalg import datasets
+from bitalg.tests.test1 import Test
+from bitalg.tests.test_core import TestCore
+
+SOURCE = '''
+import numpy as np
+from bitalg import datasets
+
+EPS = {eps}
+
+def shift(value, eps={default}):
+    return value + eps
+
+def generate_uniform_points(left=-1000, right=1000, n=10 ** 5):
+    points = datasets.uniform_points(left, right, n, seed=0) * (1 - EPS)
+    return [(shift(x), shift(y)) for x, y in points.tolist()]
+
+def generate_circle_points(O, R, n):
+    angles = np.random.default_rng(0).uniform(0, 2 * np.pi, n)
+    return list(zip((O[0] + R * np.cos(angles)).tolist(), (O[1] + R * np.sin(angles)).tolist()))
+
+def generate_collinear_points(a, b, n):
+    return list(map(tuple, datasets.collinear_points(a, b, n, seed=0).tolist()))
+'''
+
+
+def notebook(eps=0.0, default=0):
+    """
+    Functions of the lab 1 notebook, defined in a fresh module like the cells of a notebook
+    """
+    namespace = {'__name__': 'notebook'}
+    exec(SOURCE.format(eps=eps, default=default), namespace)
+    return [namespace[f'generate_{name}_points'] for name in ('uniform', 'circle', 'collinear')]
+
+
+def key(functions):
+    return TestCore.cache_key(1, 1, 1, Test.task1_func, *functions)
+
+
+def test_key_is_stable():
+    assert key(notebook()) == key(notebook())
+
+
+def test_key_changes_with_used_code():
+    base = key(notebook())
+    # default argument of a helper, a global constant
+    assert key(notebook(default=1)) != base
+    assert key(notebook(eps=0.5)) != base
+
+
+def test_key_changes_with_closure():
+    def make(scale):
+        def generate_uniform_points(left=-1000, right=1000, n=10 ** 5):
+            return [(x * scale, y * scale) for x, y in datasets.uniform_points(left, right, n).tolist()]
+        return generate_uniform_points
+
+    _, circle, collinear = notebook()
+    assert key([make(1), circle, collinear]) != key([make(2), circle, collinear])
+
+
+def test_key_changes_with_package_code(monkeypatch):
+    # the notebook calls datasets.uniform_points, which is a part of the tested code
+    base = key(notebook())
+    monkeypatch.setattr(datasets, 'uniform_points', lambda left, right, n, seed=None: np.zeros((n, 2)))
+    assert key(notebook()) != base
+
+
+def test_changed_default_invalidates_cache(tmp_path, capsys):
+    test = Test()
+    test.cache = True
+    test.cache_dir = str(tmp_path)
+
+    test.runtest(1, *notebook())
+    first = capsys.readouterr().out
+    assert first.count("Passed") == 4 and "cached" not in first
+
+    test.runtest(1, *notebook())
+    assert capsys.readouterr().out.count("Passed (cached") == 4
+
+    # the shifted points lie out of the range, a cached result would hide the error
+    test.runtest(1, *notebook(default=1))
+    output = capsys.readouterr().out
+    assert "WRONG ANSWER" in output
+    assert "cached" not in output
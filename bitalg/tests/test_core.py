@@ -1,14 +1,114 @@
-from os import path, listdir
+import hashlib
+import inspect
+import json
+import types
+from contextlib import nullcontext
+from os import path, listdir, environ, makedirs, replace, remove, utime, getpid
 from time import process_time
 from bitalg import __path__ as pkg_path
+from bitalg import profiling
 
 
 def get_test_path(lab_no, task_no, test_no):
     return path.join(pkg_path[0], f"tests/test{lab_no}_tests/task{task_no}/test_{lab_no}_{task_no}_{test_no}")
 
 
+def _hash_code(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names(const)
+    return names
+
+
+def _tracked(module, root):
+    # code of the tested module and of the package is hashed, other libraries only by name
+    return module is not None and (module == root or module.split('.')[0] == 'bitalg')
+
+
+def _hash_value(value, digest, seen, root):
+    if isinstance(value, types.ModuleType):
+        digest.update(value.__name__.encode())
+    elif isinstance(value, (types.FunctionType, types.MethodType, type)) and \
+            _tracked(getattr(value, '__module__', None), root):
+        _hash_function(value, digest, seen, root)
+    elif callable(value) and hasattr(value, '__qualname__'):
+        digest.update(f"{getattr(value, '__module__', None)}.{value.__qualname__}".encode())
+    else:
+        digest.update(repr(value).encode())
+
+
+def _hash_function(obj, digest, seen, root=None):
+    """
+    Hashes the bytecode of a function together with everything it uses which may change its result:
+    default arguments, closure cells, global constants, and functions and classes of the same module
+    or of the bitalg package (also called through a module, e.g. datasets.uniform_points)
+    """
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    obj = getattr(obj, '__func__', obj)
+    root = root if root is not None else getattr(obj, '__module__', None)
+    if isinstance(obj, type):
+        for value in vars(obj).values():
+            if isinstance(value, (types.FunctionType, staticmethod, classmethod, property)):
+                _hash_function(getattr(value, 'fget', value), digest, seen, root)
+            elif not callable(value):
+                digest.update(repr(value).encode())
+        return
+    code = getattr(obj, '__code__', None)
+    if code is None:
+        try:
+            digest.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            digest.update(repr(obj).encode())
+        return
+    _hash_code(code, digest)
+    for value in obj.__defaults__ or ():
+        _hash_value(value, digest, seen, root)
+    for name, value in sorted((obj.__kwdefaults__ or {}).items()):
+        digest.update(name.encode())
+        _hash_value(value, digest, seen, root)
+    for cell in obj.__closure__ or ():
+        try:
+            _hash_value(cell.cell_contents, digest, seen, root)
+        except ValueError:
+            # the variable is not assigned yet
+            pass
+
+    names = _names(code)
+    for name in sorted(names):
+        if name not in obj.__globals__:
+            continue
+        value = obj.__globals__[name]
+        digest.update(name.encode())
+        _hash_value(value, digest, seen, root)
+        # functions of the package used as module.function
+        if isinstance(value, types.ModuleType) and _tracked(value.__name__, root):
+            for attribute in sorted(names):
+                member = getattr(value, attribute, None)
+                if isinstance(member, (types.FunctionType, type)):
+                    _hash_function(member, digest, seen, root)
+
 class TestCore:
     sum_time = 0
+    # print counters from bitalg.profiling after every test, e.g. Test().profile = True
+    profile = False
+    # reuse results of tests whose tested functions, checker and input files did not change, e.g. Test().cache = True
+    cache = False
+    cache_dir = path.join(environ.get('BITALG_CACHE', path.join(path.expanduser('~'), '.cache', 'bitalg')), 'tests')
+    # maximal number of cached results, the least recently used ones are removed
+    cache_size = 1000
     def __init__(self):
         self.tests_in = [[4, 2],  # number of tests in [lab-1 = row][task-1 = column]
                          [11, 11],  # lab 2
@@ -29,17 +129,83 @@ class TestCore:
         for test_no in range(1, limit):
             print(f"\tTest {test_no}:", end=" ")
 
-            timer_start = process_time()
-            result, *output_expected = test_func(test_no, func, *args)
-            timer_stop = process_time()
-            self.sum_time += timer_stop - timer_start
+            key = self.cache_key(lab_no, task_no, test_no, test_func, func, *args) if self.cache else None
+            entry = self.cache_load(key) if key is not None else None
+            if entry is not None:
+                result, output_expected = entry['result'], entry['output_expected']
+                summary = entry['stats'] if self.profile else None
+                cached = f" (cached, {entry['time']:.3f}s)"
+                # the total time is the same as without the cache
+                self.sum_time += entry['time']
+            else:
+                with profiling.profile() if self.profile else nullcontext() as stats:
+                    timer_start = process_time()
+                    result, *output_expected = test_func(test_no, func, *args)
+                    timer_stop = process_time()
+                self.sum_time += timer_stop - timer_start
+                summary = stats.summary() if stats is not None else None
+                cached = ""
+                if key is not None:
+                    self.cache_store(key, {'result': result, 'time': timer_stop - timer_start, 'stats': summary,
+                                           'output_expected': [str(value) for value in output_expected]})
 
             if result == 1:
-                print("Passed")
+                print("Passed" + cached)
                 counter += 1
             else:
-                print("WRONG ANSWER")
+                print("WRONG ANSWER" + cached)
                 print(f"\t\tOutput:   {output_expected[0]}")
                 print(f"\t\tExpected: {output_expected[1]}")
+            if summary:
+                print(f"\t\tStats: {summary}")
 
         print(f"Result: {counter}/{self.tests_in[lab_no - 1][task_no - 1]}")
+
+    @staticmethod
+    def cache_key(lab_no, task_no, test_no, test_func, *args):
+        """
+        :return: hash of the checker, tested functions, other arguments and input/output files of the test
+        """
+        digest = hashlib.sha1(f"{lab_no} {task_no} {test_no}".encode())
+        seen = set()
+        for arg in (test_func, *args):
+            if callable(arg):
+                _hash_function(arg, digest, seen)
+            else:
+                digest.update(repr(arg).encode())
+        directory = path.join(pkg_path[0], f"tests/test{lab_no}_tests/task{task_no}")
+        prefix = f"test_{lab_no}_{task_no}_{test_no}."
+        if path.isdir(directory):
+            for name in sorted(listdir(directory)):
+                if name.startswith(prefix):
+                    with open(path.join(directory, name), 'rb') as file:
+                        digest.update(hashlib.sha1(file.read()).digest())
+        return digest.hexdigest()
+
+    def cache_load(self, key):
+        file_path = path.join(self.cache_dir, key + ".json")
+        try:
+            with open(file_path) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # modification time marks the last use
+        utime(file_path)
+        return entry
+
+    def cache_store(self, key, entry):
+        makedirs(self.cache_dir, exist_ok=True)
+        file_path = path.join(self.cache_dir, key + ".json")
+        temporary = f"{file_path}.{getpid()}.tmp"
+        with open(temporary, 'w') as file:
+            json.dump(entry, file)
+        replace(temporary, file_path)
+
+        entries = [path.join(self.cache_dir, name) for name in listdir(self.cache_dir) if name.endswith(".json")]
+        if len(entries) > self.cache_size:
+            entries.sort(key=path.getmtime)
+            for old in entries[:len(entries) - self.cache_size]:
+                try:
+                    remove(old)
+                except OSError:
+                    pass
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+from bitalg import datasets
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, 'cache_dir', str(tmp_path))
+    monkeypatch.setattr(datasets, 'CACHE_MIN_SIZE', 1)
+    return tmp_path
+
+
+GENERATORS = [
+    lambda seed: datasets.uniform_points(-1000, 1000, 500, seed=seed),
+    lambda seed: datasets.circle_points((0, 0), 10, 500, seed=seed),
+    lambda seed: datasets.collinear_points((-1.0, 0.0), (1.0, 0.1), 500, seed=seed),
+    lambda seed: datasets.rectangle_points((-10, -10), (10, -10), (10, 10), (-10, 10), 500, seed=seed),
+    lambda seed: datasets.square_points((0, 0), (10, 0), (10, 10), (0, 10), 25, 20, seed=seed),
+    lambda seed: datasets.uniform_sections(100, 100, 500, seed=seed),
+]
+
+
+@pytest.mark.parametrize('generate', GENERATORS)
+def test_deterministic(generate):
+    assert np.array_equal(generate(0), generate(0))
+    assert not np.array_equal(generate(0), generate(1))
+    assert np.array_equal(generate(np.random.SeedSequence(5)), generate(5))
+
+
+@pytest.mark.parametrize('generate', GENERATORS)
+def test_cache_round_trip(cache, generate):
+    first = generate(7)
+    files = os.listdir(cache)
+    assert len(files) == 1 and files[0].endswith('.npy')
+    assert np.array_equal(generate(7), first)
+    assert os.listdir(cache) == files
+    # the same coordinates given as floats are the same dataset
+    datasets.uniform_points(-1000.0, 1000.0, 500, seed=8)
+    datasets.uniform_points(-1000, 1000, 500, seed=8)
+    assert len(os.listdir(cache)) == 2
+
+
+def test_cache_key_uses_exact_seeds(cache):
+    big = 2 ** 53
+    assert not np.array_equal(datasets.uniform_points(0, 1, 100, seed=big),
+                              datasets.uniform_points(0, 1, 100, seed=big + 1))
+    sequence = np.random.SeedSequence(3)
+    assert np.array_equal(datasets.uniform_points(0, 1, 100, seed=sequence),
+                          datasets.uniform_points(0, 1, 100, seed=np.random.SeedSequence(3)))
+    assert not np.array_equal(datasets.uniform_points(0, 1, 100, seed=sequence.spawn(1)[0]),
+                              datasets.uniform_points(0, 1, 100, seed=sequence))
+    # a generator changes its state, its results are never cached
+    count = len(os.listdir(cache))
+    rng = np.random.default_rng(0)
+    assert not np.array_equal(datasets.uniform_points(0, 1, 100, seed=rng),
+                              datasets.uniform_points(0, 1, 100, seed=rng))
+    assert len(os.listdir(cache)) == count
+
+
+def test_shapes():
+    points = datasets.circle_points((1, 2), 5, 1000, seed=0)
+    assert np.hypot(points[:, 0] - 1, points[:, 1] - 2) == pytest.approx(np.full(1000, 5.0))
+    points = datasets.rectangle_points((-10, -5), (10, -5), (10, 5), (-10, 5), 1000, seed=0)
+    on_side = np.isclose(np.abs(points[:, 0]), 10) | np.isclose(np.abs(points[:, 1]), 5)
+    assert on_side.all() and (np.abs(points) <= (10, 5)).all()
+    points = datasets.square_points((0, 0), (10, 0), (10, 10), (0, 10), 25, 20, seed=0)
+    assert points.shape == (4 + 2 * 25 + 2 * 20, 2)
+    sections = datasets.uniform_sections(100, 100, 1000, seed=0)
+    assert sections.shape == (1000, 2, 2)
+    assert len(np.unique(sections[:, :, 0])) == 2000
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from bitalg.geometry.dcel import DCEL, OUTER
+from bitalg.geometry.delaunay import Delaunay
+from bitalg.project.figures import Point, TriangulatedPointSet
+from bitalg.project.main import locate, preprocess
+
+
+def area(points, triangles):
+    a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+    return ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 2
+
+
+def min_sine(points, triangles):
+    """
+    Sine of the smallest angle of the triangles
+    """
+    a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+    sides = np.sort(np.column_stack([np.hypot(*(b - a).T), np.hypot(*(c - b).T), np.hypot(*(a - c).T)]), axis=1)
+    return (2 * np.abs(area(points, triangles)) / (sides[:, 1] * sides[:, 2])).min()
+
+
+def check_dcel(dcel):
+    edges = np.nonzero(dcel.origin >= 0)[0]
+    assert (dcel.twin[dcel.twin[edges]] == edges).all()
+    assert (dcel.prev[dcel.next[edges]] == edges).all()
+    assert (dcel.face[dcel.next[edges]] == dcel.face[edges]).all()
+    assert (dcel.origin[dcel.next[edges]] == dcel.destination(edges)).all()
+    for v in dcel.vertices().tolist():
+        assert dcel.origin[dcel.vertex_edge[v]] == v
+
+
+def triangulation(n, seed):
+    points = np.random.default_rng(seed).uniform(0, 10, (n, 2))
+    return points, Delaunay(points, seed=seed).simplices
+
+
+def test_from_triangulation():
+    points, simplices = triangulation(200, 0)
+    dcel = DCEL(points, simplices)
+    check_dcel(dcel)
+    _, triangles = dcel.triangles()
+    assert {tuple(t) for t in triangles.tolist()} == {tuple(t) for t in simplices.tolist()}
+    for v in dcel.vertices().tolist():
+        neighbors = dcel.neighbors(v)
+        assert dcel.degree(v) == len(neighbors) == len(set(neighbors))
+
+
+def test_remove_vertex():
+    points, simplices = triangulation(200, 1)
+    dcel = DCEL(points, simplices)
+    total = area(points, simplices).sum()
+    removed, blocked = 0, set()
+    for v in dcel.vertices().tolist():
+        if v in blocked or any(dcel.face[h] == OUTER for h in dcel.outgoing(v)) or dcel.degree(v) > 8:
+            continue
+        # independent vertices, as in TriangulatedPointSet.remove_points
+        blocked.update(dcel.neighbors(v))
+        degree = dcel.degree(v)
+        hole = dcel.remove_vertex(v)
+        assert len(dcel.triangulate_face(hole)) == degree - 2
+        removed += 1
+    assert removed > 10
+
+    check_dcel(dcel)
+    _, triangles = dcel.triangles()
+    assert len(triangles) == len(simplices) - 2 * removed
+    assert (area(points, triangles) > 0).all()
+    assert area(points, triangles).sum() == pytest.approx(total)
+
+
+def test_triangulate_face_avoids_needles():
+    # the ear at the first vertex is a needle, the other diagonal gives two good triangles
+    points = np.array([(5, -1e-6), (10, 0), (5, 5), (0, 0)], dtype=np.float64)
+    dcel = DCEL(points, [[0, 1, 2, 3]])
+    dcel.triangulate_face(0)
+    _, triangles = dcel.triangles()
+    assert len(triangles) == 2
+    assert min_sine(points, triangles) > 0.5
+
+
+@pytest.mark.parametrize('points', [
+    [Point(x, y) for x in range(8) for y in range(8)],
+    # large coordinates, the lowest point is close to the bottom side of the covering triangle
+    [Point(x, y) for x, y in np.random.default_rng(0).uniform((0, 1000), (10, 1010), (30, 2)).tolist()],
+    [Point(x, y) for x, y in np.random.default_rng(1).uniform(-1000, 1000, (30, 2)).tolist()],
+])
+def test_remove_points(points):
+    triangulated_point_set = TriangulatedPointSet(points, seed=0)
+    triangulated_point_set.cover_with_triangle()
+    triangulated_point_set.triangulate()
+    cover = {triangulated_point_set.triangle_left_point, triangulated_point_set.triangle_right_point,
+             triangulated_point_set.triangle_top_point}
+    a, b, c = (point.to_tuple() for point in cover)
+    total = abs((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])) / 2
+    while len(triangulated_point_set.triangles) > 1:
+        before = len(triangulated_point_set.points)
+        triangulated_point_set.remove_points()
+        assert len(triangulated_point_set.points) < before
+        assert cover <= set(triangulated_point_set.points)
+        check_dcel(triangulated_point_set.dcel)
+        # the triangles still tile the covering triangle
+        vertices = Point.to_array(triangulated_point_set.vertices)
+        _, triangles = triangulated_point_set.dcel.triangles()
+        assert (area(vertices, triangles) > 0).all()
+        assert area(vertices, triangles).sum() == pytest.approx(total)
+    assert set(triangulated_point_set.points) == cover
+
+
+def test_preprocess_offset_points():
+    rng = np.random.default_rng(2)
+    for seed in range(5):
+        points = [Point(x, y) for x, y in rng.uniform((0, 200), (10, 210), (30, 2)).tolist()]
+        root = preprocess(points, visualize=False, seed=seed)
+        assert locate(root, points[0]) is not None
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from bitalg.geometry.delaunay import Delaunay
+
+scipy_spatial = pytest.importorskip('scipy.spatial')
+
+
+def triangles(points, simplices):
+    """
+    Triangles as a set of frozensets of vertex coordinates, so triangulations can be compared
+    regardless of the order of points and vertices
+    """
+    return {frozenset(map(tuple, points[simplex].tolist())) for simplex in simplices}
+
+
+def area(points, simplices):
+    a, b, c = points[simplices[:, 0]], points[simplices[:, 1]], points[simplices[:, 2]]
+    return ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 2
+
+
+def check_triangulation(triangulation, points):
+    """
+    Triangles are counterclockwise, tile the convex hull and neighbours are consistent
+    """
+    simplices, neighbors = triangulation.simplices, triangulation.neighbors
+    hull = scipy_spatial.ConvexHull(points)
+    assert (area(points, simplices) > 0).all()
+    assert area(points, simplices).sum() == pytest.approx(hull.volume)
+    for k, simplex in enumerate(simplices.tolist()):
+        for i in range(3):
+            n = neighbors[k][i]
+            edge = {simplex[(i + 1) % 3], simplex[(i + 2) % 3]}
+            if n >= 0:
+                assert edge <= set(simplices[n].tolist())
+                assert k in neighbors[n].tolist()
+
+
+def in_circle(a, b, c, d):
+    rows = [(p[0] - d[0], p[1] - d[1], (p[0] - d[0]) ** 2 + (p[1] - d[1]) ** 2) for p in (a, b, c)]
+    return np.linalg.det(np.array(rows))
+
+
+def test_random():
+    points = np.random.default_rng(0).uniform(-100, 100, (500, 2))
+    triangulation = Delaunay(points, seed=1)
+    check_triangulation(triangulation, points)
+    assert triangles(points, triangulation.simplices) == triangles(points, scipy_spatial.Delaunay(points).simplices)
+
+
+def test_insertion_order_does_not_matter():
+    points = np.random.default_rng(1).uniform(0, 1, (300, 2))
+    assert triangles(points, Delaunay(points, seed=1).simplices) == \
+           triangles(points, Delaunay(points, seed=2).simplices)
+
+
+def test_cocircular():
+    # a regular polygon with its center and a grid: the triangulation is not unique, but every one
+    # has the same number of triangles and no point inside a circumcircle
+    angles = np.linspace(0, 2 * np.pi, 16, endpoint=False)
+    polygon = np.concatenate([np.column_stack([np.cos(angles), np.sin(angles)]), [[0, 0]]])
+    grid = np.array([(x, y) for x in range(8) for y in range(8)], dtype=np.float64)
+    for points in (polygon, grid):
+        triangulation = Delaunay(points, seed=0)
+        check_triangulation(triangulation, points)
+        assert len(triangulation.simplices) == len(scipy_spatial.Delaunay(points).simplices)
+        for a, b, c in points[triangulation.simplices]:
+            assert (np.array([in_circle(a, b, c, d) for d in points]) < 1e-9).all()
+
+
+def test_duplicates():
+    rng = np.random.default_rng(2)
+    unique = rng.uniform(0, 10, (200, 2))
+    points = np.concatenate([unique, unique[:50], unique[:10]])
+    points = points[rng.permutation(len(points))]
+    triangulation = Delaunay(points, seed=0)
+    check_triangulation(triangulation, points)
+    assert triangles(points, triangulation.simplices) == triangles(unique, scipy_spatial.Delaunay(unique).simplices)
+    for duplicate, original in triangulation.duplicates.items():
+        assert (points[duplicate] == points[original]).all()
+    assert len(triangulation.duplicates) == 60
+
+
+def test_degenerate():
+    assert len(Delaunay(np.array([[0.0, 0.0], [1.0, 1.0]])).simplices) == 0
+    assert len(Delaunay(np.array([[x, 2.0 * x] for x in range(10)])).simplices) == 0
+
+
+def test_constrained():
+    rng = np.random.default_rng(3)
+    points = rng.uniform(0, 10, (200, 2))
+    # sides of the quadrilateral of extreme points, each crossing many edges of the triangulation
+    left, bottom = int(np.argmin(points[:, 0])), int(np.argmin(points[:, 1]))
+    right, top = int(np.argmax(points[:, 0])), int(np.argmax(points[:, 1]))
+    constraints = [(left, bottom), (bottom, right), (right, top), (top, left), (left, right)]
+    triangulation = Delaunay(points, constraints, seed=0)
+    check_triangulation(triangulation, points)
+
+    simplices, neighbors = triangulation.simplices, triangulation.neighbors
+    edges = {frozenset((simplex[i], simplex[(i + 1) % 3])) for simplex in simplices.tolist() for i in range(3)}
+    for a, b in constraints:
+        assert frozenset((a, b)) in edges
+    # every edge which is not constrained is locally Delaunay
+    for k, simplex in enumerate(simplices.tolist()):
+        for i in range(3):
+            n = neighbors[k][i]
+            edge = (simplex[(i + 1) % 3], simplex[(i + 2) % 3])
+            if n < 0 or (min(edge), max(edge)) in triangulation.constrained:
+                continue
+            opposite = next(v for v in simplices[n].tolist() if v not in edge)
+            assert in_circle(*points[simplex], points[opposite]) < 1e-9
+
+
+def test_halfedges():
+    points = np.random.default_rng(4).uniform(0, 1, (100, 2))
+    triangulation = Delaunay(points, seed=0)
+    origin, nxt, twin = triangulation.halfedges()
+    assert (nxt[nxt[nxt]] == np.arange(len(nxt))).all()
+    inner = twin >= 0
+    assert (twin[twin[inner]] == np.nonzero(inner)[0]).all()
+    # a half-edge and its twin have swapped ends
+    assert (origin[twin[inner]] == origin[nxt[inner]]).all()
+    assert (origin[nxt[twin[inner]]] == origin[inner]).all()
+    assert (~inner).sum() == len(scipy_spatial.ConvexHull(points).vertices)
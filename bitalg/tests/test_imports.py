@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['matplotlib', 'matplotlib.pyplot', 'matplotlib.animation', 'IPython', 'scipy']
+
+
+def imported_modules(module):
+    """
+    Imports module in a fresh interpreter and returns which of HEAVY_MODULES got imported with it
+    """
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize('module', [
+    'bitalg.visualizer.main',
+    'bitalg.visualizer.export',
+    'bitalg.project.figures',
+])
+def test_no_heavy_imports(module):
+    assert imported_modules(module) == []
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from bitalg.geometry.kdtree import KDTree, bounding_box, hull_candidates
+
+scipy_spatial = pytest.importorskip('scipy.spatial')
+
+
+def datasets():
+    rng = np.random.default_rng(0)
+    yield rng.uniform(-100, 100, (2000, 2))
+    # clusters, repeated points and a line, for degenerate splits
+    yield np.concatenate([rng.normal(0, 0.01, (500, 2)), rng.normal(50, 5, (500, 2))])
+    yield np.repeat(rng.uniform(0, 10, (50, 2)), 20, axis=0)
+    yield np.column_stack([np.arange(300.0), np.full(300, 7.0)])
+
+
+@pytest.mark.parametrize('points', list(datasets()))
+def test_range_query(points):
+    tree = KDTree(points, leaf_size=8)
+    low, high = bounding_box(points)
+    assert np.array_equal(tree.bounds[0], low) and np.array_equal(tree.bounds[1], high)
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        corners = rng.uniform(low - 1, high + 1, (2, 2))
+        lower, upper = corners.min(axis=0), corners.max(axis=0)
+        expected = np.nonzero(((points >= lower) & (points <= upper)).all(axis=1))[0]
+        assert np.array_equal(np.sort(tree.range_query(lower, upper)), expected)
+    # the whole box and a box containing no point
+    assert len(tree.range_query(low, high)) == len(points)
+    assert len(tree.range_query(high + 1, high + 2)) == 0
+
+
+@pytest.mark.parametrize('points', list(datasets()))
+def test_half_plane(points):
+    tree = KDTree(points, leaf_size=8)
+    rng = np.random.default_rng(2)
+    # random lines and lines through the points, so some points lie exactly on them
+    lines = [rng.uniform(-100, 100, (2, 2)) for _ in range(30)] + [points[rng.choice(len(points), 2)]
+                                                                     for _ in range(10)]
+    for a, b in lines:
+        side = (b[0] - a[0]) * (points[:, 1] - a[1]) - (b[1] - a[1]) * (points[:, 0] - a[0])
+        assert np.array_equal(np.sort(tree.half_plane(a, b)), np.nonzero(side >= 0)[0])
+        assert np.array_equal(np.sort(tree.half_plane(a, b, strict=True)), np.nonzero(side > 0)[0])
+
+
+@pytest.mark.parametrize('points', list(datasets()))
+def test_knn(points):
+    tree = KDTree(points, leaf_size=8)
+    queries = np.concatenate([np.random.default_rng(3).uniform(-120, 120, (100, 2)), points[:20]])
+    expected_distances, _ = scipy_spatial.cKDTree(points).query(queries, k=5)
+    distances, indices = tree.knn(queries, k=5)
+    assert distances == pytest.approx(expected_distances)
+    # ties may be broken differently, but the returned points are at the returned distances
+    assert np.hypot(*(points[indices] - queries[:, None, :]).transpose(2, 0, 1)) == pytest.approx(distances)
+    with pytest.raises(ValueError):
+        tree.knn(queries, k=0)
+    with pytest.raises(ValueError):
+        tree.knn(queries, k=len(points) + 1)
+
+
+@pytest.mark.parametrize('points', list(datasets()))
+def test_hull_candidates(points):
+    candidates = hull_candidates(points)
+    assert np.array_equal(candidates, hull_candidates(points, KDTree(points)))
+    if len(np.unique(points, axis=0)) >= 3 and np.linalg.matrix_rank(points - points[0]) == 2:
+        assert set(scipy_spatial.ConvexHull(points).vertices.tolist()) <= set(candidates.tolist())
@@ -0,0 +1,65 @@
+import copy
+import random
+
+import pytest
+
+from bitalg.project import main as kirkpatrick
+from bitalg.project import hierarchy, trapezoidal_map
+from bitalg.project.figures import Point
+
+GRID = [Point(x, y) for x in range(8) for y in range(8)]
+
+
+def engines(points, seed):
+    """
+    Locate functions of Kirkpatrick's hierarchy (also compacted) and of the trapezoidal map
+    """
+    root = kirkpatrick.preprocess(copy.deepcopy(points), visualize=False, seed=seed)
+    compacted = hierarchy.compact(kirkpatrick.preprocess(copy.deepcopy(points), visualize=False, seed=seed), 'area')
+    tmap = trapezoidal_map.preprocess(copy.deepcopy(points), seed)
+    return {'kirkpatrick': lambda point: kirkpatrick.locate(root, point),
+            'compacted': lambda point: kirkpatrick.locate(compacted, point),
+            'trapezoidal': lambda point: trapezoidal_map.locate(tmap, point)}
+
+
+def key(triangle):
+    return None if triangle is None else frozenset(point.to_tuple() for point in triangle.to_tuple())
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_grid(seed):
+    # many cocircular points, the bottom row is almost collinear with corners of the covering triangle
+    queries = [Point(5.5, 0), Point(0, 0), Point(7, 7), Point(3.5, 7), Point(0, 2.5)]
+    queries += [Point(x + 0.5, y) for x in range(7) for y in range(8)]
+    queries += [Point(x, y) for x in range(8) for y in range(8)]
+    rng = random.Random(seed)
+    inner = [Point(rng.uniform(0, 7), rng.uniform(0, 7)) for _ in range(100)]
+    outside = [Point(-1, 3), Point(3, -0.5), Point(8, 8), Point(3.5, 7.5)]
+
+    located = {name: [locate(point) for point in queries + inner + outside]
+               for name, locate in engines(GRID, seed).items()}
+    for name, results in located.items():
+        for point, triangle in zip(queries + inner, results):
+            # the trapezoidal map may put points of the convex hull below its edges, outside of the point set
+            if triangle is None and name == 'trapezoidal' and point not in inner:
+                continue
+            assert triangle is not None and triangle.contains_point(point), (name, point)
+        assert results[len(queries) + len(inner):] == [None] * len(outside), name
+    # points inside of triangles are located in the same triangle by all engines,
+    # the trapezoidal map is built on the triangulation with seed 0
+    for name, results in located.items():
+        if name == 'trapezoidal' and seed != 0:
+            continue
+        assert list(map(key, results[len(queries):])) == list(map(key, located['kirkpatrick'][len(queries):])), name
+
+
+@pytest.mark.parametrize('points', [
+    [Point(x, 0.5 * x) for x in range(10)],
+    [Point(x, 0) for x in range(10)],
+    [Point(0, y) for y in range(10)],
+])
+def test_collinear(points):
+    # every triangle has a vertex of the covering triangle, so no point lies inside of the point set
+    queries = [Point(p.x + 0.25, p.y) for p in points] + points
+    for name, locate in engines(points, 0).items():
+        assert [locate(point) for point in queries] == [None] * len(queries), name
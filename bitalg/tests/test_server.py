@@ -0,0 +1,74 @@
+import asyncio
+import copy
+import logging
+import random
+
+import numpy as np
+
+from bitalg.project import main as kirkpatrick
+from bitalg.project.figures import Point
+from bitalg.project.server import LocationServer, _client
+
+
+def server_root():
+    rng = random.Random(0)
+    return kirkpatrick.preprocess([Point(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(100)],
+                                  visualize=False)
+
+
+def test_answers():
+    async def run():
+        server = LocationServer(server_root(), max_batch=32, max_delay=0.001)
+        host, port = await server.start()
+        queries = np.random.default_rng(0).uniform(-1, 11, (300, 2)).tolist()
+        answers = await asyncio.gather(*(_client(host, port, queries, window) for window in (1, 16, 64)))
+        await server.stop()
+        return server, queries, answers
+
+    server, queries, answers = asyncio.run(run())
+    expected = [server._format(node) for node in server.hierarchy.locate(queries).tolist()]
+    assert all(result == expected for result in answers)
+    assert 'None' in expected and server.stats()['queries'] == 3 * len(queries)
+
+
+def test_invalid_query():
+    async def run():
+        server = LocationServer(server_root())
+        host, port = await server.start()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"1 2 3\n5 5\n")
+        answers = [(await reader.readline()).decode().strip() for _ in range(2)]
+        writer.close()
+        await server.stop()
+        return server, answers
+
+    server, answers = asyncio.run(run())
+    assert answers[0].startswith("ERROR")
+    assert answers[1] == server._format(int(server.hierarchy.locate([(5, 5)])[0]))
+
+
+def test_aborted_client(caplog):
+    # the client sends many queries and disconnects without reading the answers
+    async def run():
+        server = LocationServer(server_root(), max_batch=8, max_delay=0.0)
+        host, port = await server.start()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write("".join(f"{x!r} {y!r}\n" for x, y in
+                             np.random.default_rng(1).uniform(0, 10, (5000, 2)).tolist()).encode())
+        await writer.drain()
+        await reader.readline()
+        writer.transport.abort()
+        for _ in range(100):
+            if not server._connections:
+                break
+            await asyncio.sleep(0.01)
+        connections = len(server._connections)
+        await asyncio.wait_for(server.stop(), 5)
+        return server, connections
+
+    with caplog.at_level(logging.WARNING, logger='asyncio'):
+        server, connections = asyncio.run(run())
+    assert connections == 0
+    # queries read before the disconnection are dropped, not located
+    assert server.stats()['queries'] < 1000
+    assert not [record for record in caplog.records if 'socket.send' in record.getMessage()]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from bitalg.project.tiled import TiledTriangulation
+
+scipy_spatial = pytest.importorskip('scipy.spatial')
+
+
+def clouds():
+    rng = np.random.default_rng(0)
+    uniform = rng.uniform(0, 100, (2000, 2))
+    t = rng.uniform(0, 1, 1500)
+    # a thin diagonal band: tiles far from the band have no points and large empty circles cross them
+    band = np.column_stack([t * 100, t * 100 + rng.normal(0, 0.2, len(t))])
+    return {'uniform': uniform, 'duplicates': np.concatenate([uniform, uniform[:300]]), 'band': band}
+
+
+def canonical(points):
+    """
+    :return: index of the first equal point for every point, so triangles of duplicates can be compared
+    """
+    _, inverse = np.unique(points, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    first = np.full(inverse.max() + 1, len(points))
+    np.minimum.at(first, inverse, np.arange(len(points)))
+    return first[inverse]
+
+
+@pytest.mark.parametrize('name', ['uniform', 'duplicates', 'band'])
+def test_matches_scipy(tmp_path, name):
+    points = clouds()[name]
+    np.save(tmp_path / 'points.npy', points)
+    tiled = TiledTriangulation.build(tmp_path / 'points.npy', tmp_path / 'tiles', tile_points=250, chunk_size=700,
+                                     seed=0)
+    assert len(tiled.tiles) > 1
+
+    reference = scipy_spatial.Delaunay(points)
+    ids = canonical(points)
+    expected = {tuple(sorted(simplex)) for simplex in ids[reference.simplices].tolist()}
+    assert {tuple(sorted(simplex)) for simplex in np.asarray(tiled.triangles()).tolist()} == expected
+
+    queries = np.random.default_rng(1).uniform(points.min(axis=0) - 1, points.max(axis=0) + 1, (2000, 2))
+    located = tiled.locate(queries)
+    simplex = reference.find_simplex(queries)
+    assert ((located < 0).all(axis=1) == (simplex < 0)).all()
+    inside = simplex >= 0
+    assert (np.sort(located[inside], axis=1) == np.sort(ids[reference.simplices[simplex[inside]]], axis=1)).all()
+
+    if name == 'band':
+        # the initial margin doesn't certify the triangles of the band, they are rebuilt with larger margins
+        assert len({tile['margin'] for tile in tiled.tiles}) > 1
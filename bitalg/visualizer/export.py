@@ -0,0 +1,31 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .plot.plot import Plot
+
+
+def _export_scene(plot_data, data, filename, formats):
+    return Plot.export(plot_data, data, filename, formats)
+
+
+def export_scenes(scenes, directory, formats=('png',), workers=None):
+    """
+    Saves many visualizations to files without showing them.
+    Figures are built without pyplot, so no GUI backend is needed and it is safe to run in many processes.
+    :param scenes: dictionary {name: Visualizer} or list of Visualizers (named scene_0, scene_1, ...)
+    :param directory: target directory, created if it does not exist
+    :param formats: file formats (extensions) to save every scene in, e.g. ('png', 'svg')
+    :param workers: number of worker processes, None - export in the current process
+    :return: list of saved file paths
+    """
+    if not isinstance(scenes, dict):
+        scenes = {f'scene_{i}': vis for i, vis in enumerate(scenes)}
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(vis.plot_data, vis.data, os.path.join(directory, name), tuple(formats)) for name, vis in scenes.items()]
+
+    if workers is None:
+        results = [_export_scene(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_export_scene, *zip(*jobs)))
+    return [filename for filenames in results for filename in filenames]
@@ -1,6 +1,47 @@
+import numpy as np
+
+
 class Figure:
+    # figures of such type drawn one after another with the same options can be drawn as a single artist
+    mergeable = False
+    # figures drawn without a color take the next one from the color cycle of the axes
+    cycles_colors = False
+    color_options = ('c', 'color', 'colors', 'facecolor', 'facecolors')
+
     def __init__(self, data, options):
         self.data = data
         self.options = options
         self.artist = None
         self.to_be_removed = False
+
+    def __getstate__(self):
+        # artists belong to a matplotlib figure of the current process, they are never pickled
+        state = self.__dict__.copy()
+        state['artist'] = None
+        return state
+
+    def style_key(self):
+        """
+        Key identifying figures which can be merged into one artist, None if the figure can't be merged
+        """
+        if not self.mergeable:
+            return None
+        if self.cycles_colors and not any(name in self.options for name in self.color_options):
+            # every such figure is drawn in another color, merged ones would share one
+            return None
+        key = []
+        for name, value in sorted(self.options.items()):
+            if not isinstance(value, str) and hasattr(value, '__len__'):
+                # per element values (e.g. list of colors) would not match merged data
+                if len(value) != 1:
+                    return None
+                value = tuple(value)
+            key.append((name, value))
+        return type(self), tuple(key)
+
+    @classmethod
+    def merge(cls, figures):
+        """
+        Single figure holding data of all given figures (all of them have to have the same style_key)
+        """
+        return cls(np.concatenate([figure.data for figure in figures]), figures[0].options)
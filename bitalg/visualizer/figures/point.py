@@ -3,6 +3,9 @@ import numpy as np
 
 
 class Point(Figure):
+    mergeable = True
+    cycles_colors = True
+
     def __init__(self, data, options):
         data = np.array(data).reshape(-1, 2)
         super().__init__(data, options)
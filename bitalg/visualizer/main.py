@@ -18,6 +18,10 @@ class Visualizer:
     def add_grid(self):
         self.plot_data['grid'] = True
 
+    def enable_lod(self, max_elements=10 ** 4):
+        # point and segment figures larger than max_elements are drawn at the resolution of the plot
+        self.plot_data['lod'] = max_elements
+
     def add_point(self, data, **kwargs):
         point = Point(data, kwargs)
         self.data.append(point)
@@ -62,9 +66,15 @@ class Visualizer:
     def save(self, filename='plot'):
         Plot.save(self.plot_data, self.data, filename)
 
+    def export(self, filename='plot', formats=('png',)):
+        return Plot.export(self.plot_data, self.data, filename, formats)
+
     def show_gif(self, interval=256):
         gif = Plot.show_gif(self.plot_data, self.data, interval)
         return gif
 
     def save_gif(self, filename='animation', interval=256):
         Plot.save_gif(self.plot_data, self.data, interval, filename)
+
+    def save_mp4(self, filename='animation', interval=256):
+        Plot.save_mp4(self.plot_data, self.data, interval, filename)
@@ -0,0 +1,115 @@
+import numpy as np
+
+from ..figures.point import Point
+from ..figures.line_segment import LineSegment
+
+
+def is_dense(figure, max_elements):
+    return isinstance(figure, (Point, LineSegment)) and len(figure.data) > max_elements
+
+
+def figure_color(figure):
+    from matplotlib.colors import to_rgba
+
+    # per element colors can't be kept in a density image, the first one is used then
+    color = figure.options.get('color', figure.options.get('c', 'C0'))
+    try:
+        return to_rgba(color)
+    except ValueError:
+        return to_rgba(color[0])
+
+
+def pixel_grid(ax):
+    # size of the axes in pixels, the raster has one cell per pixel
+    bbox = ax.get_window_extent()
+    return max(int(bbox.width), 1), max(int(bbox.height), 1)
+
+
+def draw_density(ax, points, color, shape, xlim, ylim):
+    """
+    Draws points as an image where every pixel is coloured according to the number of points in it
+    """
+    from matplotlib.colors import LinearSegmentedColormap, LogNorm
+
+    density, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=shape, range=(xlim, ylim))
+    if not density.any():
+        return None
+    cmap = LinearSegmentedColormap.from_list('density', [(*color[:3], 0.25 * color[3]), color])
+    return ax.imshow(np.ma.masked_equal(density.T, 0), extent=(*xlim, *ylim), origin='lower', cmap=cmap,
+                     norm=LogNorm(vmin=1, vmax=max(density.max(), 1 + 1e-9)), interpolation='nearest',
+                     aspect='auto', zorder=1)
+
+
+def pixel_scale(shape, xlim, ylim):
+    return np.array([shape[0] / (xlim[1] - xlim[0]), shape[1] / (ylim[1] - ylim[0])])
+
+
+def simplify_segments(segments, shape, xlim, ylim):
+    """
+    Snaps segment ends to pixel centres and removes duplicates.
+    :return: (segments longer than a pixel, midpoints of segments shorter than a pixel)
+    """
+    scale = pixel_scale(shape, xlim, ylim)
+    origin = np.array([xlim[0], ylim[0]])
+    pixels = np.floor((segments - origin) * scale)
+
+    short = np.all(pixels[:, 0] == pixels[:, 1], axis=1)
+    midpoints = segments[short].mean(axis=1)
+
+    # the same segment in both directions is drawn only once
+    pixels = pixels[~short]
+    swap = (pixels[:, 0, 0] > pixels[:, 1, 0]) | \
+           ((pixels[:, 0, 0] == pixels[:, 1, 0]) & (pixels[:, 0, 1] > pixels[:, 1, 1]))
+    pixels[swap] = pixels[swap, ::-1]
+    pixels = np.unique(pixels.reshape(-1, 4), axis=0).reshape(-1, 2, 2)
+    return (pixels + 0.5) / scale + origin, midpoints
+
+
+def sample_segments(segments, shape, xlim, ylim):
+    """
+    Points placed along every segment, one per pixel it crosses
+    """
+    scale = pixel_scale(shape, xlim, ylim)
+    vectors = segments[:, 1] - segments[:, 0]
+    counts = np.ceil(np.abs(vectors * scale).max(axis=1)).astype(np.int64) + 1
+    index = np.repeat(np.arange(len(segments)), counts)
+    step = np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = step / np.repeat(np.maximum(counts - 1, 1), counts)
+    return segments[index, 0] + vectors[index] * t[:, None]
+
+
+def draw(ax, figures, max_elements):
+    """
+    Draws figures, replacing figures with more than max_elements points or segments by their
+    approximation at the resolution of the axes, so that drawing cost depends on the image size only.
+    Points are drawn as a density image. Segments are snapped to the pixel grid, those shorter than
+    a pixel are merged into a density image and if there are still more than max_elements of them,
+    all of them are rasterized.
+    """
+    from matplotlib.collections import LineCollection
+
+    dense = [figure for figure in figures if is_dense(figure, max_elements)]
+    for figure in figures:
+        if figure in dense:
+            ax.update_datalim(figure.data.reshape(-1, 2))
+        else:
+            figure.draw(ax)
+    if not dense:
+        return
+
+    ax.autoscale()
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+    shape = pixel_grid(ax)
+    for figure in dense:
+        color = figure_color(figure)
+        if isinstance(figure, Point):
+            draw_density(ax, figure.data, color, shape, xlim, ylim)
+            continue
+        segments, points = simplify_segments(figure.data, shape, xlim, ylim)
+        if len(segments) > max_elements:
+            points = np.concatenate([points, sample_segments(segments, shape, xlim, ylim)])
+        else:
+            ax.add_collection(LineCollection(segments, **figure.options))
+        draw_density(ax, points, color, shape, xlim, ylim)
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
@@ -1,13 +1,41 @@
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from IPython.display import Image
 import os
+import tempfile
+
+from . import lod
+
+# matplotlib (and IPython for show_gif) are imported in the methods, so that importing
+# the visualizer stays cheap for code which only computes geometry
 
 
 class Plot:
     @staticmethod
-    def __build_plot(plot_data, data):
-        fig, ax = plt.subplots()
+    def __coalesce(data):
+        # merge runs of consecutive figures with the same style, so that each run is drawn as one artist
+        runs = []
+        last_key = None
+        for figure in data:
+            if figure.to_be_removed:
+                continue
+            key = figure.style_key()
+            if key is not None and key == last_key:
+                runs[-1].append(figure)
+            else:
+                runs.append([figure])
+            last_key = key
+        return [run[0] if len(run) == 1 else type(run[0]).merge(run) for run in runs]
+
+    @staticmethod
+    def __build_plot(plot_data, data, headless=False):
+        # headless figures are not registered in pyplot, so they need no GUI backend and no closing
+        if headless:
+            from matplotlib.figure import Figure
+
+            fig = Figure()
+            ax = fig.subplots()
+        else:
+            import matplotlib.pyplot as plt
+
+            fig, ax = plt.subplots()
         ax.set_xlabel('x')
         ax.set_ylabel('y')
 
@@ -16,8 +44,11 @@ class Plot:
         if 'grid' in plot_data:
             ax.grid()
 
-        for figure in data:
-            if not figure.to_be_removed:
+        figures = Plot.__coalesce(data)
+        if 'lod' in plot_data:
+            lod.draw(ax, figures, plot_data['lod'])
+        else:
+            for figure in figures:
                 figure.draw(ax)
 
         ax.autoscale()
@@ -25,30 +56,70 @@ class Plot:
 
     @staticmethod
     def __build_gif(plot_data, data, interval):
+        # every frame only applies one change (drawing or removing one figure) to the axes,
+        # so no list of all artists visible in every frame has to be kept
+        import matplotlib.pyplot as plt
+        import matplotlib.animation as animation
+
         fig, ax = plt.subplots()
-        artists = []
-        frames = [ax.set_xlabel('x'), ax.set_ylabel('y')]
-        artists.append(frames[:])
+        ax.set_xlabel('x')
+        ax.set_ylabel('y')
 
         if 'title' in plot_data:
             ax.set_title(plot_data['title'])
         if 'grid' in plot_data:
             ax.grid()
 
+        # limits are fixed up front, to the ones which the whole drawing would have
         for figure in data:
+            figure.artist = None
+        for figure in data:
+            if figure.artist is None:
+                figure.artist = figure.draw(ax)
+        ax.autoscale()
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        for figure in data:
+            if figure.artist:
+                for artist in figure.artist:
+                    artist.remove()
+                figure.artist = None
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        ax.set_prop_cycle(None)
+
+        def init():
+            return []
+
+        def update(frame):
+            if frame == 0:
+                return []
+            figure = data[frame - 1]
             if figure.to_be_removed and figure.artist:
-                first = frames.index(figure.artist[0])
-                last = frames.index(figure.artist[-1])
+                for artist in figure.artist:
+                    artist.remove()
                 figure.artist = None
-                frames = frames[:first] + frames[last+1:]
-            else:
-                artist = figure.draw(ax)
-                figure.artist = artist
-                frames.extend(artist)
-            artists.append(frames[:])
-                
-        ax.autoscale()
-        return animation.ArtistAnimation(fig=fig, artists=artists, interval=interval, blit=True)
+                return []
+            figure.artist = figure.draw(ax)
+            return figure.artist
+
+        return fig, animation.FuncAnimation(fig=fig, func=update, frames=len(data) + 1, init_func=init,
+                                            interval=interval, repeat=False, cache_frame_data=False)
+
+    @staticmethod
+    def __writer(filename, interval):
+        # ffmpeg and imagemagick get frames through a pipe one by one,
+        # pillow keeps them until the end, so it is used only when nothing else is available
+        import matplotlib.animation as animation
+
+        fps = 1000 / interval
+        if not filename.endswith('.gif'):
+            if animation.writers.is_available('ffmpeg'):
+                return animation.writers['ffmpeg'](fps=fps)
+            raise RuntimeError('Saving video requires ffmpeg.')
+        for name in ('ffmpeg', 'imagemagick'):
+            if animation.writers.is_available(name):
+                return animation.writers[name](fps=fps)
+        return animation.PillowWriter(fps=fps)
 
     @staticmethod
     def show(plot_data, data):
@@ -57,21 +128,44 @@ class Plot:
 
     @staticmethod
     def save(plot_data, data, filename):
-        fig, _ = Plot.__build_plot(plot_data, data)
+        fig, _ = Plot.__build_plot(plot_data, data, headless=True)
         fig.savefig(filename)
-        plt.close()
+
+    @staticmethod
+    def export(plot_data, data, filename, formats=('png',)):
+        # the figure is built once and saved in every format
+        fig, _ = Plot.__build_plot(plot_data, data, headless=True)
+        filenames = [f'{filename}.{extension}' for extension in formats]
+        for name in filenames:
+            fig.savefig(name)
+        return filenames
 
     @staticmethod
     def show_gif(plot_data, data, interval):
-        Plot.save_gif(plot_data, data, interval,
-                      f'{__file__}.__tmp_animation_holder__')
-        plt.close()
-        gif = Image(f'{__file__}.__tmp_animation_holder__.gif')
-        os.remove(f'{__file__}.__tmp_animation_holder__.gif')
-        return gif
+        from IPython.display import Image
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'animation')
+            Plot.save_gif(plot_data, data, interval, filename)
+            with open(f'{filename}.gif', 'rb') as file:
+                return Image(data=file.read(), format='gif')
 
     @staticmethod
     def save_gif(plot_data, data, interval, filename):
-        anim = Plot.__build_gif(plot_data, data, interval)
-        anim.save(filename=f'{filename}.gif', writer='pillow')
-        plt.close()
+        Plot.save_animation(plot_data, data, interval, f'{filename}.gif')
+
+    @staticmethod
+    def save_mp4(plot_data, data, interval, filename):
+        Plot.save_animation(plot_data, data, interval, f'{filename}.mp4')
+
+    @staticmethod
+    def save_animation(plot_data, data, interval, filename):
+        import matplotlib.pyplot as plt
+
+        # the writer is chosen first, so a missing one leaves no figure behind
+        writer = Plot.__writer(filename, interval)
+        fig, anim = Plot.__build_gif(plot_data, data, interval)
+        try:
+            anim.save(filename=filename, writer=writer)
+        finally:
+            plt.close(fig)